@@ -14,7 +14,12 @@ CUSTOMIZE THIS FOR YOUR USE CASE:
 """
 
 import os
+import re
 import asyncio
+import logging
+import logging.handlers
+import queue
+from dataclasses import dataclass
 from typing import Optional
 
 # A2A SDK
@@ -28,6 +33,7 @@ import uvicorn
 
 # Registration
 import httpx
+import orjson
 
 
 # ============================================
@@ -42,6 +48,30 @@ AGENT_PUBLIC_URL = os.getenv("AGENT_PUBLIC_URL", f"http://localhost:{AGENT_PORT}
 POROS_REGISTRY_URL = os.getenv("POROS_REGISTRY_URL", "http://localhost:8000")
 POROS_AUTH_TOKEN = os.getenv("POROS_AUTH_TOKEN")  # JWT token from registration
 
+# Logging - per-request logs go through a QueueHandler so formatting and
+# stream flushing happen on a background thread, not in the request path.
+# Per-query chatter is DEBUG; bump AGENT_LOG_LEVEL to see it.
+logger = logging.getLogger("agent")
+
+
+def _setup_logging() -> logging.handlers.QueueListener:
+    log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("[AGENT] %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(os.getenv("AGENT_LOG_LEVEL", "INFO"))
+    listener.start()
+    return listener
+
+
+_log_listener = _setup_logging()
+
+# Shared HTTP client - created on startup, closed on shutdown.
+# Reusing one pooled client keeps TCP/TLS connections alive across
+# registration attempts instead of paying a full handshake per call.
+_client: Optional[httpx.AsyncClient] = None
+
 
 # ============================================
 # AGENT CARD (A2A Protocol)
@@ -80,28 +110,47 @@ AGENT_CARD = {
     }
 }
 
+# The card is static after import - serialize the registration body once
+# instead of paying dict->JSON on every registration attempt.
+_REGISTRATION_BODY = orjson.dumps({"agent_card": AGENT_CARD})
+
 
 # ============================================
 # AGENT LOGIC (CUSTOMIZE THIS!)
 # ============================================
 
 # Mock weather data (replace with real API call to OpenWeather, etc.)
+# Slotted frozen instances are lighter than per-entry dicts, which matters
+# once this becomes a real table with many entries. Keys are pre-lowercased;
+# display_name keeps the pretty form so lookups never re-case strings.
+
+@dataclass(slots=True, frozen=True)
+class Weather:
+    display_name: str
+    temp_f: int
+    conditions: str
+    forecast: str
+
+
 MOCK_WEATHER = {
-    "san francisco": {
-        "temp_f": 65,
-        "conditions": "Partly Cloudy",
-        "forecast": "Cool and foggy morning, clearing by afternoon"
-    },
-    "seattle": {
-        "temp_f": 52,
-        "conditions": "Rainy",
-        "forecast": "Showers throughout the day"
-    },
-    "new york": {
-        "temp_f": 45,
-        "conditions": "Clear",
-        "forecast": "Cold and sunny"
-    }
+    "san francisco": Weather(
+        display_name="San Francisco",
+        temp_f=65,
+        conditions="Partly Cloudy",
+        forecast="Cool and foggy morning, clearing by afternoon"
+    ),
+    "seattle": Weather(
+        display_name="Seattle",
+        temp_f=52,
+        conditions="Rainy",
+        forecast="Showers throughout the day"
+    ),
+    "new york": Weather(
+        display_name="New York",
+        temp_f=45,
+        conditions="Clear",
+        forecast="Cold and sunny"
+    )
 }
 
 
@@ -115,14 +164,12 @@ async def handle_message(message: Message, context: RequestContext) -> Task:
     - Generate response
     - Return as A2A Task with Artifacts
     """
-    # Extract query from message
-    query = ""
-    if message.parts:
-        for part in message.parts:
-            if hasattr(part, 'text'):
-                query += part.text
+    # Extract query from message (single join, no per-part concatenation)
+    query = "".join(
+        part.text for part in (message.parts or ()) if hasattr(part, 'text')
+    )
 
-    print(f"[AGENT] Received query: {query}")
+    logger.debug("Received query: %s", query)
 
     # YOUR CUSTOM LOGIC HERE
     # Example: Simple weather lookup
@@ -132,10 +179,10 @@ async def handle_message(message: Message, context: RequestContext) -> Task:
     # Format response
     if weather:
         response_text = (
-            f"Weather in {city.title()}:\\n"
-            f"Temperature: {weather['temp_f']}°F\\n"
-            f"Conditions: {weather['conditions']}\\n"
-            f"Forecast: {weather['forecast']}"
+            f"Weather in {weather.display_name}:\\n"
+            f"Temperature: {weather.temp_f}°F\\n"
+            f"Conditions: {weather.conditions}\\n"
+            f"Forecast: {weather.forecast}"
         )
     else:
         response_text = f"Sorry, I don't have weather data for {city}"
@@ -148,29 +195,35 @@ async def handle_message(message: Message, context: RequestContext) -> Task:
         )
     ]
 
-    print(f"[AGENT] Responding with: {response_text[:100]}...")
+    logger.debug("Responding with: %.100s...", response_text)
     return task
 
 
+# Single precompiled alternation: one C-level scan of the query instead of
+# one substring search per known city. For a real city table in the
+# thousands, switch to pyahocorasick.
+_CITY_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(city) for city in MOCK_WEATHER) + r')\b',
+    re.IGNORECASE
+)
+
+
 def extract_city(query: str) -> str:
     """Extract city name from query (simple version)"""
-    query_lower = query.lower()
-    for city in MOCK_WEATHER.keys():
-        if city in query_lower:
-            return city
-    return "unknown"
+    match = _CITY_RE.search(query)
+    return match.group(1).lower() if match else "unknown"
 
 
-def get_weather(city: str) -> Optional[dict]:
+def get_weather(city: str) -> Optional[Weather]:
     """
-    Get weather for city.
+    Get weather for city (expects a lowercased city name).
 
     REPLACE THIS with real API call:
     - OpenWeather API
     - Weather.gov
     - Your own weather service
     """
-    return MOCK_WEATHER.get(city.lower())
+    return MOCK_WEATHER.get(city)
 
 
 # ============================================
@@ -210,34 +263,35 @@ async def register_with_poros():
     3. Run this agent - it will auto-register
     """
     if not POROS_AUTH_TOKEN:
-        print("[AGENT] POROS_AUTH_TOKEN not set - skipping registration")
-        print("[AGENT] To register:")
-        print("[AGENT] 1. Create account: POST http://localhost:8000/api/registry/users")
-        print("[AGENT] 2. Set POROS_AUTH_TOKEN env var")
-        print("[AGENT] 3. Restart agent")
+        logger.info("POROS_AUTH_TOKEN not set - skipping registration")
+        logger.info("To register:")
+        logger.info("1. Create account: POST http://localhost:8000/api/registry/users")
+        logger.info("2. Set POROS_AUTH_TOKEN env var")
+        logger.info("3. Restart agent")
         return
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{POROS_REGISTRY_URL}/api/registry/agents",
-                json={"agent_card": AGENT_CARD},
-                headers={"Authorization": f"Bearer {POROS_AUTH_TOKEN}"},
-                timeout=10.0
-            )
-
-            if response.status_code == 201:
-                data = response.json()
-                print(f"[AGENT] Successfully registered with Poros!")
-                print(f"[AGENT] Agent ID: {data['agent_id']}")
-            elif response.status_code == 409:
-                print(f"[AGENT] Already registered with Poros")
-            else:
-                print(f"[AGENT] Registration failed: {response.status_code}")
-                print(f"[AGENT] Response: {response.text}")
+        response = await _client.post(
+            f"{POROS_REGISTRY_URL}/api/registry/agents",
+            content=_REGISTRATION_BODY,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {POROS_AUTH_TOKEN}"
+            }
+        )
+
+        if response.status_code == 201:
+            data = response.json()
+            logger.info("Successfully registered with Poros!")
+            logger.info("Agent ID: %s", data['agent_id'])
+        elif response.status_code == 409:
+            logger.info("Already registered with Poros")
+        else:
+            logger.warning("Registration failed: %s", response.status_code)
+            logger.warning("Response: %s", response.text)
 
     except Exception as e:
-        print(f"[AGENT] Registration error: {e}")
+        logger.warning("Registration error: %s", e)
 
 
 # ============================================
@@ -246,20 +300,35 @@ async def register_with_poros():
 
 @app.on_event("startup")
 async def startup():
-    """Register agent with Poros on startup"""
-    print(f"[AGENT] {AGENT_NAME} starting...")
-    print(f"[AGENT] URL: {AGENT_PUBLIC_URL}")
-    print(f"[AGENT] Skills: {[s['name'] for s in AGENT_CARD['skills']]}")
+    """Create the shared HTTP client and register agent with Poros"""
+    global _client
+    _client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=10.0
+    )
+
+    logger.info("%s starting...", AGENT_NAME)
+    logger.info("URL: %s", AGENT_PUBLIC_URL)
+    logger.info("Skills: %s", [s['name'] for s in AGENT_CARD['skills']])
 
     # Register with Poros in background
     asyncio.create_task(register_with_poros())
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the shared HTTP client"""
+    if _client is not None:
+        await _client.aclose()
+
+
 # ============================================
 # RUN SERVER
 # ============================================
 
 if __name__ == "__main__":
+    import sys
+
     print("=" * 60)
     print(f"POROS AGENT: {AGENT_NAME}")
     print("=" * 60)
@@ -268,9 +337,15 @@ if __name__ == "__main__":
     print(f"Registry: {POROS_REGISTRY_URL}")
     print("=" * 60)
 
+    # C event loop + HTTP parser (from uvicorn[standard]); not on Windows
+    loop_kwargs = {}
+    if sys.platform != "win32":
+        loop_kwargs = {"loop": "uvloop", "http": "httptools"}
+
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=AGENT_PORT,
-        log_level="info"
+        log_level="info",
+        **loop_kwargs
     )
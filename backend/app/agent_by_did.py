@@ -0,0 +1,83 @@
+"""
+Poros Protocol - DID -> Agent Lookup Cache
+
+The verb endpoints (QUERY/PROPOSE/COMMIT/CANCEL) resolve an agent by DID
+on every call, but agent rows change rarely. Cache the hot fields in
+process for a short TTL so repeat verb traffic skips the DB round-trip.
+"""
+
+from typing import NamedTuple, Optional
+import threading
+
+from cachetools import TTLCache
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models import RegisteredAgent
+
+
+class CachedAgent(NamedTuple):
+    """Lightweight projection of RegisteredAgent used on verb hot paths"""
+    id: int
+    agent_id: str
+    name: str
+    url: str
+    is_active: bool
+    query_url: Optional[str]
+    propose_url: Optional[str]
+    commit_url: Optional[str]
+    cancel_url: Optional[str]
+
+
+# Short TTL keeps staleness bounded even if an invalidation is missed.
+# The lock is a threading.Lock, not asyncio: invalidate() runs from
+# sync routes in the threadpool, and TTLCache isn't thread-safe, so the
+# guard has to exclude threads as well as tasks. The critical sections
+# are dict-op sized, so holding it briefly on the event loop is fine.
+_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_cache_lock = threading.Lock()
+
+
+async def get_agent_cached(session: AsyncSession, did: str) -> Optional[CachedAgent]:
+    """
+    Resolve an agent by DID, serving repeat lookups from the TTL cache.
+
+    Only caches the fields the verb forwarders need (never the full ORM
+    row, which would pin a detached session object). Misses fall through
+    to the existing indexed select on RegisteredAgent.did.
+    """
+    with _cache_lock:
+        cached = _cache.get(did)
+    if cached is not None:
+        return cached
+
+    statement = select(RegisteredAgent).where(RegisteredAgent.did == did)
+    agent = (await session.exec(statement)).first()
+
+    if agent is None:
+        # Don't negative-cache: a just-registered agent should be
+        # reachable immediately
+        return None
+
+    cached = CachedAgent(
+        id=agent.id,
+        agent_id=agent.agent_id,
+        name=agent.name,
+        url=agent.url,
+        is_active=agent.is_active,
+        query_url=agent.query_url,
+        propose_url=agent.propose_url,
+        commit_url=agent.commit_url,
+        cancel_url=agent.cancel_url
+    )
+    with _cache_lock:
+        _cache[did] = cached
+
+    return cached
+
+
+def invalidate(did: Optional[str]) -> None:
+    """Drop a DID from the cache after registration changes or deletes"""
+    if did:
+        with _cache_lock:
+            _cache.pop(did, None)
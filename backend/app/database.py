@@ -2,8 +2,10 @@
 Poros Protocol - Database Configuration
 """
 
-from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
 import os
 
 # Database URL - defaults to SQLite for development
@@ -11,23 +13,98 @@ DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./poros_registry.db")
 
 # Create engine
 # For SQLite, use check_same_thread=False to allow FastAPI async operations
-connect_args = {}
+# For Postgres (production), configure the connection pool explicitly:
+# defaults are pool_size=5 with no pre-ping, which churns connections and
+# surfaces stale-connection errors under concurrent load.
 if DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        echo=False,  # Set to True for SQL query logging
+    )
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=20,
+        max_overflow=40,
+        pool_pre_ping=True,   # Validate connections before use
+        pool_recycle=1800,    # Recycle before server-side idle timeouts
+        echo=False,  # Set to True for SQL query logging
+    )
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args=connect_args,
-    echo=False,  # Set to True for SQL query logging
-)
+
+# Async engine - used by async routes (orchestrator, verb forwarders) so
+# DB work is awaited instead of blocking the event loop. The sync engine
+# above stays for init_db and plain-def routes that run in the threadpool.
+if DATABASE_URL.startswith("sqlite"):
+    ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+else:
+    ASYNC_DATABASE_URL = DATABASE_URL.replace(
+        "postgresql://", "postgresql+asyncpg://", 1
+    ).replace("postgres://", "postgresql+asyncpg://", 1)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=20,
+        max_overflow=40,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        echo=False,
+    )
+
+
+# Columns added after the first deployments. create_all never ALTERs
+# an existing table, so they are patched in here at startup; a plain
+# nullable ADD COLUMN is valid on both SQLite and Postgres.
+_VERB_URL_COLUMNS = ("query_url", "propose_url", "commit_url", "cancel_url")
+
+
+def _ensure_verb_url_columns():
+    """Add the precomputed verb-endpoint columns to pre-existing tables"""
+    existing = {col["name"] for col in inspect(engine).get_columns("registered_agents")}
+    missing = [column for column in _VERB_URL_COLUMNS if column not in existing]
+    if not missing:
+        return
+    with engine.begin() as conn:
+        for column in missing:
+            conn.execute(text(f"ALTER TABLE registered_agents ADD COLUMN {column} VARCHAR"))
+
+
+def _backfill_skill_tags():
+    """Populate agent_skill_tags for agents registered before it existed"""
+    # Tag rows are only written at registration time, so agents that
+    # predate the table would silently vanish from skill-filtered
+    # discovery. Rebuild their rows from the stored card once, here.
+    from .models import AgentSkillTag, RegisteredAgent, extract_agent_tags
+
+    with Session(engine) as session:
+        untagged = session.exec(
+            select(RegisteredAgent).where(
+                RegisteredAgent.id.not_in(select(AgentSkillTag.agent_id))
+            )
+        ).all()
+        if not untagged:
+            return
+        for agent in untagged:
+            for tag in extract_agent_tags(agent.agent_card, agent.skills_tags):
+                session.add(AgentSkillTag(agent_id=agent.id, tag=tag))
+        session.commit()
 
 
 def init_db():
     """Initialize database tables"""
     SQLModel.metadata.create_all(engine)
+    _ensure_verb_url_columns()
+    _backfill_skill_tags()
 
 
 def get_session():
     """Dependency for getting database session"""
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    """Dependency for getting an async database session"""
+    async with AsyncSession(async_engine) as session:
+        yield session
@@ -0,0 +1,52 @@
+"""
+Poros Protocol - Shared Outbound HTTP Client
+
+One long-lived httpx.AsyncClient for all agent-facing calls (orchestrator
+fan-out and the v2 verb forwarders). A fresh client per request forces a
+full TCP+TLS handshake per call; the shared pool keeps connections alive
+and multiplexes over HTTP/2 where agents support it.
+"""
+
+from typing import Optional
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def init_client() -> httpx.AsyncClient:
+    """Create the shared client. Called from the app startup event."""
+    global _client
+    if _client is None:
+        limits = httpx.Limits(
+            max_connections=1000,
+            max_keepalive_connections=500,
+            keepalive_expiry=30.0
+        )
+        _client = httpx.AsyncClient(
+            # Explicit transport: connection pool tuned for high fan-out,
+            # no automatic retries (the orchestrator owns failure policy)
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=limits,
+                retries=0
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            # Skip per-request proxy/env lookups; agent URLs are direct
+            trust_env=False
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client. Called from the app shutdown event."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client (creating it lazily outside the app)."""
+    if _client is None:
+        return init_client()
+    return _client
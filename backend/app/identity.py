@@ -4,14 +4,51 @@ Poros Protocol - Identity & Cryptography Module
 Handles DID generation, Ed25519 key management, and AgentCard signing/verification.
 """
 
-import json
 import base64
-from typing import Tuple
+import hashlib
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Tuple
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 from cryptography.hazmat.primitives import serialization
 from cryptography.exceptions import InvalidSignature
 
 
+# ============================================
+# KEY CACHING
+# ============================================
+#
+# PEM parsing (PKCS8/ASN.1) and public-key construction are surprisingly
+# expensive compared to the Ed25519 sign/verify primitive itself. Since the
+# signing API is typically hit repeatedly with the same keys, cache the
+# loaded key objects.
+
+@lru_cache(maxsize=1024)
+def _load_private_key(pem_hash: str, pem: str) -> Ed25519PrivateKey:
+    """Load (and cache) a private key from its PEM encoding"""
+    return serialization.load_pem_private_key(
+        pem.encode('utf-8'),
+        password=None
+    )
+
+
+@lru_cache(maxsize=1024)
+def _load_public_key(did: str) -> Ed25519PublicKey:
+    """Load (and cache) the public key embedded in a Poros DID"""
+    public_key_b64 = did.split(":")[-1]
+
+    # Raw Ed25519 keys are 32 bytes -> always 43 unpadded b64url chars,
+    # so exactly one '=' restores the padding; no length branch needed.
+    public_bytes = base64.urlsafe_b64decode(public_key_b64 + '=')
+    return Ed25519PublicKey.from_public_bytes(public_bytes)
+
+
+def _pem_cache_key(private_key_pem: str) -> str:
+    """Short digest used as the cache key for a PEM string"""
+    return hashlib.blake2b(private_key_pem.encode('utf-8'), digest_size=16).hexdigest()
+
+
 def generate_keypair() -> Tuple[str, str]:
     """
     Generate a new Ed25519 keypair.
@@ -56,15 +93,11 @@ def sign_agent_card(agent_card_dict: dict, private_key_pem: str) -> str:
     Returns:
         Base64-encoded signature
     """
-    # Canonicalize the agent card (deterministic JSON)
-    canonical_json = json.dumps(agent_card_dict, sort_keys=True, separators=(',', ':'))
-    message = canonical_json.encode('utf-8')
+    # Canonicalize the agent card (deterministic JSON, bytes straight from C)
+    message = orjson.dumps(agent_card_dict, option=orjson.OPT_SORT_KEYS)
 
-    # Load private key
-    private_key = serialization.load_pem_private_key(
-        private_key_pem.encode('utf-8'),
-        password=None
-    )
+    # Load private key (cached by PEM digest)
+    private_key = _load_private_key(_pem_cache_key(private_key_pem), private_key_pem)
 
     # Sign the message
     signature = private_key.sign(message)
@@ -90,21 +123,11 @@ def verify_agent_card(agent_card_dict: dict, signature_b64: str, did: str) -> bo
         if not did.startswith("did:poros:ed25519:"):
             return False
 
-        public_key_b64 = did.split(":")[-1]
-
-        # Add padding if needed
-        padding = 4 - (len(public_key_b64) % 4)
-        if padding != 4:
-            public_key_b64 += '=' * padding
-
-        public_bytes = base64.urlsafe_b64decode(public_key_b64)
-
-        # Load public key
-        public_key = Ed25519PublicKey.from_public_bytes(public_bytes)
+        # Load public key (cached by DID)
+        public_key = _load_public_key(did)
 
         # Canonicalize the agent card
-        canonical_json = json.dumps(agent_card_dict, sort_keys=True, separators=(',', ':'))
-        message = canonical_json.encode('utf-8')
+        message = orjson.dumps(agent_card_dict, option=orjson.OPT_SORT_KEYS)
 
         # Decode signature
         signature = base64.b64decode(signature_b64)
@@ -120,6 +143,44 @@ def verify_agent_card(agent_card_dict: dict, signature_b64: str, did: str) -> bo
         return False
 
 
+_BATCH_VERIFY_PARALLEL_THRESHOLD = 16
+
+
+@lru_cache(maxsize=1)
+def _verify_executor() -> ThreadPoolExecutor:
+    """Shared pool for batch verification (created on first use)"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="ed25519-verify")
+
+
+def verify_agent_cards_batch(cards: List[Tuple[dict, str, str]]) -> List[bool]:
+    """
+    Verify a batch of AgentCard signatures.
+
+    Useful for bulk lookups (e.g. re-verifying all registered agents on
+    startup). Key objects are shared across the batch via the DID cache,
+    so N cards signed by the same key pay for one key load. Large batches
+    verify on a thread pool - the cryptography backend releases the GIL
+    inside Ed25519 verify, so the per-card work runs in parallel.
+
+    Args:
+        cards: List of (agent_card_dict, signature_b64, did) tuples
+
+    Returns:
+        List of booleans, one per card, in input order
+    """
+    # Below this, thread dispatch overhead exceeds the verify cost
+    if len(cards) < _BATCH_VERIFY_PARALLEL_THRESHOLD:
+        return [
+            verify_agent_card(agent_card_dict, signature_b64, did)
+            for agent_card_dict, signature_b64, did in cards
+        ]
+
+    # executor.map preserves input order
+    return list(_verify_executor().map(
+        lambda card: verify_agent_card(*card), cards
+    ))
+
+
 def extract_public_key_from_did(did: str) -> str:
     """
     Extract the base64-encoded public key from a Poros DID.
@@ -4,14 +4,24 @@ Poros Protocol - Identity API Endpoints
 Handles DID generation and AgentCard signing for agent developers.
 """
 
+import hashlib
+
+import orjson
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+from cachetools import TTLCache
 
 from . import identity
 
 router = APIRouter(prefix="/api/identity", tags=["Identity & DIDs"])
 
+# Deploy tooling tends to re-sign the same card repeatedly; cache
+# signatures for idempotent requests so they skip the dict copy, the
+# canonical JSON encode, and the Ed25519 signing op entirely.
+# Keyed by (card digest, PEM digest), short TTL.
+_signature_cache: TTLCache = TTLCache(maxsize=4096, ttl=300)
+
 
 class GenerateDIDResponse(BaseModel):
     did: str
@@ -70,11 +80,28 @@ async def sign_agent_card(request: SignAgentCardRequest):
     the AgentCard hasn't been tampered with.
     """
     try:
-        # Remove signature field if it exists (we're about to create it)
-        agent_card_unsigned = {k: v for k, v in request.agent_card.items() if k != 'signature'}
+        # Remove signature field if it exists (we're about to create it).
+        # Unsigned cards are the common case here - don't copy the dict
+        # unless there's actually a signature to strip.
+        if 'signature' in request.agent_card:
+            agent_card_unsigned = {k: v for k, v in request.agent_card.items() if k != 'signature'}
+        else:
+            agent_card_unsigned = request.agent_card
+
+        # Short-circuit idempotent re-signing of the same card + key
+        cache_key = (
+            hashlib.blake2b(
+                orjson.dumps(agent_card_unsigned, option=orjson.OPT_SORT_KEYS),
+                digest_size=16
+            ).digest(),
+            identity._pem_cache_key(request.private_key_pem)
+        )
+        signature = _signature_cache.get(cache_key)
 
-        # Sign the agent card
-        signature = identity.sign_agent_card(agent_card_unsigned, request.private_key_pem)
+        if signature is None:
+            # Sign the agent card
+            signature = identity.sign_agent_card(agent_card_unsigned, request.private_key_pem)
+            _signature_cache[cache_key] = signature
 
         # Add signature to the agent card
         signed_card = {**agent_card_unsigned, "signature": signature}
@@ -96,8 +123,11 @@ async def verify_agent_card(request: VerifyAgentCardRequest):
     1. The signature was created by the private key corresponding to the DID
     2. The AgentCard data hasn't been modified since signing
     """
-    # Remove signature from agent card for verification
-    agent_card_unsigned = {k: v for k, v in request.agent_card.items() if k != 'signature'}
+    # Remove signature from agent card for verification (copy only if present)
+    if 'signature' in request.agent_card:
+        agent_card_unsigned = {k: v for k, v in request.agent_card.items() if k != 'signature'}
+    else:
+        agent_card_unsigned = request.agent_card
 
     is_valid = identity.verify_agent_card(agent_card_unsigned, request.signature, request.did)
 
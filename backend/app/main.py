@@ -13,10 +13,12 @@ Built on Google's Agent-to-Agent (A2A) protocol specification.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 import logging
+import orjson
 
 from .database import init_db
+from .http_client import init_client, close_client
 from .registry import router as registry_router
 from .orchestrator import router as orchestrator_router
 from .identity_api import router as identity_router
@@ -67,16 +69,25 @@ app = FastAPI(
     """,
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson serializes responses in C - agent cards are KBs of nested
+    # JSON, so every route benefits without per-route changes
+    default_response_class=ORJSONResponse
 )
 
-# CORS middleware - Allow all origins for public API
+# CORS middleware - one compiled regex covering the frontend deployments
+# (Vercel) and local dev, instead of a wildcard list scanned per request.
+# Unlike allow_origins=["*"], this form also stays valid if we ever turn
+# on credentialed requests.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origin_regex=r"^(https://([a-z0-9-]+\.)?vercel\.app|http://(localhost|127\.0\.0\.1)(:\d+)?)$",
     allow_credentials=False,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit method/header lists let the middleware precompute the
+    # preflight response headers once at startup instead of assembling
+    # them per request
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["authorization", "content-type"],
 )
 
 
@@ -90,6 +101,8 @@ async def startup_event():
     logger.info("Poros Protocol starting up...")
     init_db()
     logger.info("Database initialized")
+    init_client()
+    logger.info("Outbound HTTP client ready")
     logger.info("Poros Protocol ready!")
 
 
@@ -97,36 +110,44 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Poros Protocol shutting down...")
+    await close_client()
 
 
 # ============================================
 # ROUTES
 # ============================================
 
+# Static bodies serialized once at import - load balancers hammer these
+# endpoints, so skip per-request dict construction and serialization.
+_ROOT_BODY = orjson.dumps({
+    "service": "Poros Protocol",
+    "version": "1.0.0",
+    "status": "operational",
+    "description": "Agent registration, discovery, and orchestration infrastructure",
+    "protocol": "A2A (Agent-to-Agent) compliant",
+    "docs": "/docs",
+    "components": {
+        "registry": "/api/registry",
+        "orchestrator": "/api/orchestrator"
+    }
+})
+
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "timestamp": "2025-01-21T00:00:00Z"
+})
+
+
 @app.get("/")
 async def root():
     """Health check and service info"""
-    return {
-        "service": "Poros Protocol",
-        "version": "1.0.0",
-        "status": "operational",
-        "description": "Agent registration, discovery, and orchestration infrastructure",
-        "protocol": "A2A (Agent-to-Agent) compliant",
-        "docs": "/docs",
-        "components": {
-            "registry": "/api/registry",
-            "orchestrator": "/api/orchestrator"
-        }
-    }
+    return Response(_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": "2025-01-21T00:00:00Z"
-    }
+    return Response(_HEALTH_BODY, media_type="application/json")
 
 
 # Include routers
@@ -154,11 +175,30 @@ async def global_exception_handler(request, exc):
 
 
 if __name__ == "__main__":
+    import os
+    import sys
     import uvicorn
+
+    # uvloop/httptools (bundled with uvicorn[standard]) replace the default
+    # asyncio loop and h11 parser with C implementations. Not on Windows.
+    loop_kwargs = {}
+    if sys.platform != "win32":
+        loop_kwargs = {"loop": "uvloop", "http": "httptools"}
+
+    # Auto-reload is for local dev only; uvicorn can't combine it with
+    # multiple workers. In production, run one process per core so the
+    # CPU-bound paths (bcrypt, Ed25519 signing) aren't GIL-bound.
+    if os.getenv("POROS_RELOAD", "1") == "1":
+        loop_kwargs["reload"] = True
+    else:
+        loop_kwargs["workers"] = int(
+            os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)
+        )
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        log_level="info",
+        **loop_kwargs
     )
@@ -5,9 +5,28 @@ Stores registered AgentCards and orchestration history using the A2A protocol sc
 """
 
 from sqlmodel import SQLModel, Field, Column, JSON
-from typing import Optional, Dict, Any, List
-from datetime import datetime
-from pydantic import BaseModel
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import Optional, Dict, Any, List, NamedTuple
+from datetime import datetime, timezone
+from functools import cached_property
+from pydantic import BaseModel, ConfigDict
+
+
+def utcnow() -> datetime:
+    """Timezone-aware UTC now (datetime.utcnow is deprecated in 3.12)"""
+    return datetime.now(timezone.utc)
+
+
+def json_column() -> Column:
+    """
+    JSON column that becomes JSONB on Postgres.
+
+    JSONB is binary-stored and GIN-indexable (jsonb_path_ops), so
+    production deployments can index card contents without a schema
+    fork; SQLite dev keeps the plain JSON type.
+    """
+    return Column(JSON().with_variant(JSONB(), "postgresql"))
 
 
 # ============================================
@@ -22,7 +41,7 @@ class User(SQLModel, table=True):
     username: str = Field(index=True, unique=True)
     email: Optional[str] = None
     password_hash: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     is_active: bool = Field(default=True)
 
 
@@ -39,6 +58,13 @@ class RegisteredAgent(SQLModel, table=True):
     """
     __tablename__ = "registered_agents"
 
+    # Composite index for the default discovery filter+order: every
+    # list_agents call hits is_active, so this turns the seqscan into
+    # an index scan
+    __table_args__ = (
+        Index("ix_registered_agent_active_id", "is_active", "agent_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # Agent identity
@@ -47,7 +73,7 @@ class RegisteredAgent(SQLModel, table=True):
     owner_id: int = Field(foreign_key="users.id")
 
     # AgentCard JSON (full A2A protocol AgentCard)
-    agent_card: Dict[str, Any] = Field(sa_column=Column(JSON))
+    agent_card: Dict[str, Any] = Field(sa_column=json_column())
 
     # Extracted for indexing/search
     name: str = Field(index=True)
@@ -56,19 +82,152 @@ class RegisteredAgent(SQLModel, table=True):
     preferred_transport: str = Field(default="JSONRPC")
 
     # Skills (for capability-based discovery)
-    skills_tags: List[str] = Field(sa_column=Column(JSON), default=[])  # Flattened skill tags
+    skills_tags: List[str] = Field(sa_column=json_column(), default=[])  # Flattened skill tags
+
+    # Precomputed verb endpoints - set at registration so the forwarding
+    # hot paths don't re-suffix the base URL on every call. Nullable for
+    # rows registered before these columns existed; init_db ALTERs them
+    # onto pre-existing tables, since create_all only creates new ones.
+    query_url: Optional[str] = None
+    propose_url: Optional[str] = None
+    commit_url: Optional[str] = None
+    cancel_url: Optional[str] = None
 
     # Status
     is_active: bool = Field(default=True)
     last_verified: Optional[datetime] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
 
     # Metrics (for ranking)
     total_calls: int = Field(default=0)
     success_rate: float = Field(default=1.0)
     avg_latency_ms: float = Field(default=0.0)
 
+    @cached_property
+    def skills_tag_set(self) -> frozenset:
+        """
+        Normalized tag set for O(1) membership checks and Jaccard overlap.
+
+        Cached per instance - rows live for one request, so staleness
+        isn't a concern even if skills_tags is mutated mid-flight.
+        """
+        return frozenset(self.skills_tags or ())
+
+    # Card sub-dict accessors, cached so repeated filters/rankers don't
+    # re-walk the AgentCard JSON per access
+
+    @cached_property
+    def card_skills(self) -> List[Any]:
+        return self.agent_card.get("skills", [])
+
+    @cached_property
+    def card_capabilities(self) -> List[Any]:
+        return self.agent_card.get("capabilities", [])
+
+    @cached_property
+    def card_pricing(self) -> Dict[str, Any]:
+        return self.agent_card.get("pricing", {})
+
+    @cached_property
+    def card_metadata(self) -> Dict[str, Any]:
+        return self.agent_card.get("metadata", {})
+
+
+class AgentLite(NamedTuple):
+    """
+    Read-only projection of RegisteredAgent for the orchestration hot
+    path. Built from a plain column select, so no ORM instance is
+    hydrated per candidate row; carries exactly the fields ranking,
+    fan-out and the response builder touch.
+    """
+    id: int
+    agent_id: str
+    name: str
+    description: str
+    url: str
+    did: Optional[str]
+    query_url: Optional[str]
+    skills_tags: List[str]
+    skills_tag_set: frozenset
+    agent_card: Dict[str, Any]
+    success_rate: float
+    avg_latency_ms: float
+    total_calls: int
+
+    # Columns to select, in field order (skills_tag_set is derived)
+    SELECT_COLUMNS = (
+        "id", "agent_id", "name", "description", "url", "did",
+        "query_url", "skills_tags", "agent_card",
+        "success_rate", "avg_latency_ms", "total_calls"
+    )
+
+    # Same card accessors as RegisteredAgent (plain properties - tuples
+    # have no __dict__ to cache into, and a dict .get is already cheap)
+
+    @property
+    def card_skills(self) -> List[Any]:
+        return self.agent_card.get("skills", [])
+
+    @property
+    def card_pricing(self) -> Dict[str, Any]:
+        return self.agent_card.get("pricing", {})
+
+    @property
+    def card_metadata(self) -> Dict[str, Any]:
+        return self.agent_card.get("metadata", {})
+
+    @classmethod
+    def from_row(cls, row) -> "AgentLite":
+        return cls(
+            id=row.id,
+            agent_id=row.agent_id,
+            name=row.name,
+            description=row.description,
+            url=row.url,
+            did=row.did,
+            query_url=row.query_url,
+            skills_tags=row.skills_tags,
+            skills_tag_set=frozenset(row.skills_tags or ()),
+            agent_card=row.agent_card,
+            success_rate=row.success_rate,
+            avg_latency_ms=row.avg_latency_ms,
+            total_calls=row.total_calls
+        )
+
+
+class AgentSkillTag(SQLModel, table=True):
+    """
+    Denormalized (agent, tag) rows for indexed capability lookup.
+
+    Populated at registration from the flattened skill tags plus the
+    AgentCard's capability names and skill ids, so discovery/orchestration
+    filter with an indexed SQL query instead of scanning every agent's
+    JSON card in Python.
+    """
+    __tablename__ = "agent_skill_tags"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    agent_id: int = Field(foreign_key="registered_agents.id", index=True)
+    tag: str = Field(index=True)
+
+
+def extract_agent_tags(agent_card: Dict[str, Any], skills_tags: List[str]) -> List[str]:
+    """Collect every tag an agent should be discoverable under"""
+    tags = set(skills_tags)
+
+    for cap in agent_card.get("capabilities", []):
+        if isinstance(cap, dict) and cap.get("name"):
+            tags.add(cap["name"])
+        elif isinstance(cap, str):
+            tags.add(cap)
+
+    for skill in agent_card.get("skills", []):
+        if isinstance(skill, dict) and skill.get("id"):
+            tags.add(skill["id"])
+
+    return list(tags)
+
 
 # ============================================
 # ORCHESTRATION LOGS
@@ -85,18 +244,18 @@ class OrchestrationLog(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # Client request
-    client_query: Dict[str, Any] = Field(sa_column=Column(JSON))
+    client_query: Dict[str, Any] = Field(sa_column=json_column())
     skill_filter: Optional[str] = None
 
     # Selected agents
-    selected_agents: List[str] = Field(sa_column=Column(JSON))  # List of agent_ids
+    selected_agents: List[str] = Field(sa_column=json_column())  # List of agent_ids
 
     # Results
-    results: Dict[str, Any] = Field(sa_column=Column(JSON))
+    results: Dict[str, Any] = Field(sa_column=json_column())
     success: bool = Field(default=True)
 
     # Timing
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     latency_ms: float = Field(default=0.0)
 
 
@@ -128,6 +287,10 @@ class AgentCardSubmit(BaseModel):
 
 class AgentCardResponse(BaseModel):
     """Return registered AgentCard"""
+    # Validate straight off ORM rows - endpoints return the row and let
+    # the response_model convert it (C-accelerated in pydantic v2)
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     agent_id: str
     did: Optional[str] = None  # Decentralized identifier for Poros Protocol v2
@@ -140,6 +303,24 @@ class AgentCardResponse(BaseModel):
     created_at: datetime
 
 
+class AgentCardSummaryResponse(BaseModel):
+    """
+    Lightweight listing row - everything except the full agent_card
+    JSON, which is by far the widest column. Listings validate straight
+    off column-select rows; fetch /agents/{agent_id} for the full card.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    agent_id: str
+    did: Optional[str] = None
+    name: str
+    description: str
+    url: str
+    is_active: bool
+    created_at: datetime
+
+
 class OrchestrateRequest(BaseModel):
     """
     Client request to orchestrate a query across agents.
@@ -4,23 +4,28 @@ Poros Protocol - Orchestrator (A2A: Agent-to-Agent Communication)
 Routes client queries to registered agents using the A2A protocol.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import select, Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import update
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import io
 import time
 import asyncio
-
-# Simple HTTP client for calling agents
 import httpx
+import orjson
 
 from .models import (
     RegisteredAgent,
+    AgentLite,
+    AgentSkillTag,
     OrchestrationLog,
     OrchestrateRequest,
     OrchestrateResponse
 )
-from .database import get_session
+from .database import get_async_session, async_engine
+from .http_client import get_client
 from .auth import get_current_user_optional
 
 # Import PROPRIETARY ranking system (YOUR competitive advantage!)
@@ -28,13 +33,78 @@ from .ranking import rank_agents
 
 router = APIRouter(prefix="/api/orchestrator", tags=["Orchestrator"])
 
+# Bound concurrent outbound agent calls so a large fan-out can't exhaust
+# sockets/file descriptors; calls still overlap up to this limit.
+_AGENT_CALL_SEMAPHORE = asyncio.Semaphore(10)
+
+# Fan-out deadlines: wait for everyone up to the soft deadline, then
+# return as soon as enough agents have answered; the hard deadline caps
+# the whole fan-out regardless, so one dead agent can't stall the response.
+_FANOUT_SOFT_DEADLINE_S = 10.0
+_FANOUT_HARD_DEADLINE_S = 30.0
+
+
+async def gather_with_deadline(
+    coros,
+    soft_deadline_s: float = _FANOUT_SOFT_DEADLINE_S,
+    hard_deadline_s: float = _FANOUT_HARD_DEADLINE_S,
+    min_required: int = 1
+) -> List[Any]:
+    """
+    Run coroutines concurrently with a tail-latency clamp.
+
+    Returns a list aligned with the input order. Completed coroutines
+    contribute their result (or exception); stragglers are cancelled once
+    the deadline policy is met and reported as asyncio.TimeoutError.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    start = time.monotonic()
+    pending = set(tasks)
+
+    while pending:
+        elapsed = time.monotonic() - start
+        if elapsed >= hard_deadline_s:
+            break
+
+        finished = len(tasks) - len(pending)
+        if finished >= min_required and elapsed >= soft_deadline_s:
+            break
+
+        # Wake at the next deadline even if nothing completes
+        wait_timeout = hard_deadline_s - elapsed
+        if finished >= min_required:
+            wait_timeout = min(wait_timeout, soft_deadline_s - elapsed)
+
+        done, pending = await asyncio.wait(
+            pending,
+            timeout=wait_timeout,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+
+    # Cancel stragglers and reap them so nothing leaks past the response
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = []
+    for task in tasks:
+        if task in pending or task.cancelled():
+            results.append(asyncio.TimeoutError("agent call exceeded orchestration deadline"))
+        elif task.exception() is not None:
+            results.append(task.exception())
+        else:
+            results.append(task.result())
+
+    return results
+
 
 # ============================================
 # A2A AGENT CALLING
 # ============================================
 
 async def call_agent_http(
-    agent: RegisteredAgent,
+    agent: AgentLite,
     query: str,
     timeout: float = 30.0
 ) -> Dict[str, Any]:
@@ -44,19 +114,27 @@ async def call_agent_http(
     Agents implement a simple /query endpoint that accepts JSON.
     """
     try:
-        # Simple HTTP call to agent endpoint
-        url = agent.url
-        if not url.endswith("/query"):
-            url = f"{url}/query"
+        # Simple HTTP call to agent endpoint (precomputed at registration;
+        # fall back to suffixing for rows that predate the column)
+        url = agent.query_url or f"{agent.url.rstrip('/')}/query"
 
-        payload = {"query": query}
+        # orjson on both sides of the wire: the stdlib json path inside
+        # httpx is measurably slower on large agent payloads
+        body = orjson.dumps({"query": query})
 
         start_time = time.time()
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(url, json=payload)
+        async with _AGENT_CALL_SEMAPHORE:
+            # Tight connect timeout: a dead agent fails fast instead of
+            # consuming the read budget just to establish a connection
+            response = await get_client().post(
+                url,
+                content=body,
+                headers={"content-type": "application/json"},
+                timeout=httpx.Timeout(timeout, connect=2.0)
+            )
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
         latency = (time.time() - start_time) * 1000  # Convert to ms
 
@@ -84,11 +162,19 @@ async def call_agent_http(
 # ORCHESTRATION ENDPOINT
 # ============================================
 
+async def _persist_log(log: OrchestrationLog) -> None:
+    """Insert an orchestration log outside the request critical path"""
+    async with AsyncSession(async_engine) as session:
+        session.add(log)
+        await session.commit()
+
+
 @router.post("/orchestrate", response_model=OrchestrateResponse)
 async def orchestrate(
     request: OrchestrateRequest,
+    background_tasks: BackgroundTasks,
     current_user: Optional[dict] = Depends(get_current_user_optional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Orchestrate a client query across registered agents.
@@ -102,18 +188,24 @@ async def orchestrate(
     """
     start_time = time.time()
 
-    # Step 1: Discover agents
-    query_db = select(RegisteredAgent).where(RegisteredAgent.is_active == True)
-    all_agents = session.exec(query_db).all()
-
-    # Filter by skill tags if provided
+    # Step 1: Discover agents - skill filter pushed into SQL against the
+    # indexed tag table instead of scanning every agent's JSON in Python.
+    # Plain column select: candidates are read-only here, so skip ORM
+    # hydration and wrap the rows in AgentLite tuples.
+    query_db = select(
+        *(getattr(RegisteredAgent, column) for column in AgentLite.SELECT_COLUMNS)
+    ).where(RegisteredAgent.is_active == True)
     if request.skill_tags:
-        matching_agents = [
-            a for a in all_agents
-            if any(tag in a.skills_tags for tag in request.skill_tags)
-        ]
-    else:
-        matching_agents = all_agents
+        query_db = query_db.where(
+            RegisteredAgent.id.in_(
+                select(AgentSkillTag.agent_id).where(
+                    AgentSkillTag.tag.in_(request.skill_tags)
+                )
+            )
+        )
+    matching_agents = [
+        AgentLite.from_row(row) for row in (await session.exec(query_db)).all()
+    ]
 
     if not matching_agents:
         raise HTTPException(
@@ -121,24 +213,29 @@ async def orchestrate(
             detail="No agents found matching criteria"
         )
 
-    # Step 2: Rank agents
+    # Step 2: Rank agents (partial selection - the tail never gets
+    # sorted; headroom for preferred agents so the merge still works)
     ranked_agents = rank_agents(
         matching_agents,
         request.query,
-        request.skill_tags
+        request.skill_tags,
+        top_k=request.max_agents + len(request.prefer_agent_ids or [])
     )
 
     # Step 3: Select top N agents
     selected_agents = ranked_agents[:request.max_agents]
 
-    # Prefer specific agents if requested
+    # Prefer specific agents if requested (set-based dedup on agent_id,
+    # so the merge stays O(N) instead of O(N * preferred))
     if request.prefer_agent_ids:
+        preferred_ids = set(request.prefer_agent_ids)
         preferred = [
             a for a in matching_agents
-            if a.agent_id in request.prefer_agent_ids
+            if a.agent_id in preferred_ids
         ]
+        seen = {a.agent_id for a in preferred}
         selected_agents = preferred + [
-            a for a in selected_agents if a not in preferred
+            a for a in selected_agents if a.agent_id not in seen
         ]
         selected_agents = selected_agents[:request.max_agents]
 
@@ -148,48 +245,72 @@ async def orchestrate(
         for agent in selected_agents
     ]
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    results = await gather_with_deadline(tasks, min_required=1)
 
-    # Handle exceptions
+    # Handle timeouts/exceptions, collecting the success partition and
+    # overall flag in the same pass (no re-scans for summary/logging)
     formatted_results = []
-    for result in results:
-        if isinstance(result, Exception):
-            formatted_results.append({
+    successful_results = []
+    all_success = True
+    for agent, result in zip(selected_agents, results):
+        if isinstance(result, asyncio.TimeoutError):
+            item = {
+                "agent_id": agent.agent_id,
+                "agent_name": agent.name,
+                "status": "timeout",
+                "error": str(result),
+                "latency_ms": 0.0
+            }
+            all_success = False
+        elif isinstance(result, Exception):
+            item = {
                 "status": "error",
                 "error": str(result)
-            })
+            }
+            all_success = False
         else:
-            formatted_results.append(result)
-
-    # Step 5: Update agent metrics
+            item = result
+            if item.get("status") == "success":
+                successful_results.append(item)
+            else:
+                all_success = False
+        formatted_results.append(item)
+
+    # Step 5: Compute agent metric updates (without dirtying ORM rows,
+    # so they flush as one executemany UPDATE by primary key below)
+    metric_updates = []
     for agent, result in zip(selected_agents, formatted_results):
         if isinstance(result, dict):
-            agent.total_calls += 1
-
-            # Update success rate (exponential moving average)
+            # Success rate / latency: exponential moving averages
             success = 1.0 if result.get("status") == "success" else 0.0
-            agent.success_rate = (agent.success_rate * 0.9) + (success * 0.1)
-
-            # Update avg latency
+            new_latency = agent.avg_latency_ms
             if result.get("latency_ms", 0) > 0:
-                agent.avg_latency_ms = (agent.avg_latency_ms * 0.9) + (result["latency_ms"] * 0.1)
+                new_latency = (agent.avg_latency_ms * 0.9) + (result["latency_ms"] * 0.1)
 
-    session.commit()
+            metric_updates.append({
+                "id": agent.id,
+                "total_calls": agent.total_calls + 1,
+                "success_rate": (agent.success_rate * 0.9) + (success * 0.1),
+                "avg_latency_ms": new_latency
+            })
 
     # Calculate total latency
     total_latency = (time.time() - start_time) * 1000
 
-    # Step 6: Log orchestration
-    log = OrchestrationLog(
+    # Step 6: Flush metrics (one bulk UPDATE), then hand the audit log to
+    # a background task - its insert shouldn't delay the response
+    if metric_updates:
+        await session.execute(update(RegisteredAgent), metric_updates)
+        await session.commit()
+
+    background_tasks.add_task(_persist_log, OrchestrationLog(
         client_query={"query": request.query, "skill_tags": request.skill_tags},
         skill_filter=",".join(request.skill_tags) if request.skill_tags else None,
         selected_agents=[a.agent_id for a in selected_agents],
         results={"results": formatted_results},
-        success=all(r.get("status") == "success" for r in formatted_results),
+        success=all_success,
         latency_ms=total_latency
-    )
-    session.add(log)
-    session.commit()
+    ))
 
     # Step 7: Return response
     return OrchestrateResponse(
@@ -199,37 +320,38 @@ async def orchestrate(
                 "agent_id": a.agent_id,
                 "name": a.name,
                 "url": a.url,
-                "skills": [skill["name"] for skill in a.agent_card.get("skills", [])]
+                "skills": [skill["name"] for skill in a.card_skills]
             }
             for a in selected_agents
         ],
         results=formatted_results,
-        summary=_generate_summary(request.query, formatted_results),
+        summary=_generate_summary(request.query, successful_results, len(formatted_results)),
         latency_ms=total_latency
     )
 
 
-def _generate_summary(query: str, results: List[Dict[str, Any]]) -> str:
+def _generate_summary(query: str, successful: List[Dict[str, Any]], total: int) -> str:
     """
     Generate a simple text summary of orchestration results.
 
+    Takes the pre-partitioned successful results so the caller's single
+    aggregation pass isn't repeated here.
+
     TODO: Use LLM to generate intelligent summary
     """
-    successful = [r for r in results if r.get("status") == "success"]
-
     if not successful:
         return "No agents successfully responded to your query."
 
-    summary_parts = [f"Query: {query}\n"]
-    summary_parts.append(f"Agents responded: {len(successful)}/{len(results)}\n")
+    # Stream into one buffer instead of accumulating/joining a parts list
+    buf = io.StringIO()
+    buf.write(f"Query: {query}\n\nAgents responded: {len(successful)}/{total}\n")
 
     for result in successful:
-        agent_name = result.get("agent_name", "Unknown")
-        summary_parts.append(f"\n{agent_name}:")
-
-        artifacts = result.get("artifacts", [])
-        for artifact in artifacts:
-            if artifact.get("type") == "text":
-                summary_parts.append(f"  {artifact.get('content', '')}")
+        buf.write(f"\n\n{result.get('agent_name', 'Unknown')}:")
+        buf.writelines(
+            f"\n  {artifact.get('content', '')}"
+            for artifact in result.get("artifacts", ())
+            if artifact.get("type") == "text"
+        )
 
-    return "\n".join(summary_parts)
+    return buf.getvalue()
@@ -6,12 +6,17 @@ Implements the 5 core verbs: DISCOVER, QUERY, PROPOSE, COMMIT, CANCEL
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import select, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
 import httpx
+import orjson
 
-from .models import RegisteredAgent
-from .database import get_session
+from .models import RegisteredAgent, AgentSkillTag
+from .database import get_session, get_async_session
+from .http_client import get_client
+from .agent_by_did import get_agent_cached
 from . import identity
 
 router = APIRouter(prefix="/orchestrate", tags=["Poros Protocol v2"])
@@ -41,6 +46,14 @@ class QueryResponse(BaseModel):
     signature: Optional[str] = None
 
 
+class QueryBulkRequest(BaseModel):
+    queries: List[QueryRequest]
+
+
+class QueryBulkResponse(BaseModel):
+    results: List[Dict[str, Any]]
+
+
 class ProposeRequest(BaseModel):
     agent_did: str
     proposal: Dict[str, Any]
@@ -84,7 +97,7 @@ class CancelResponse(BaseModel):
 # ============================================
 
 @router.post("/discover", response_model=DiscoverResponse)
-async def discover_agents(
+def discover_agents(
     request: DiscoverRequest,
     session: Session = Depends(get_session)
 ):
@@ -94,40 +107,19 @@ async def discover_agents(
     This endpoint searches the registry for agents that have the requested
     capability and match optional filters like location, price, etc.
     """
-    # Query agents by capability (stored in skills_tags)
+    # Query agents by capability via the indexed tag table (populated at
+    # registration from skills_tags + capabilities[].name + skills[].id),
+    # instead of scanning every agent's JSON card in Python
     statement = select(RegisteredAgent).where(
         RegisteredAgent.is_active == True
+    ).where(
+        RegisteredAgent.id.in_(
+            select(AgentSkillTag.agent_id).where(
+                AgentSkillTag.tag == request.capability
+            )
+        )
     )
-    all_agents = session.exec(statement).all()
-
-    # Filter by capability
-    matching_agents = []
-    for agent in all_agents:
-        # Check if capability matches:
-        # 1. In skills_tags (flattened tags)
-        # 2. In capabilities[].name (capability name)
-        # 3. In skills[].id (skill ID)
-        matched = False
-
-        if request.capability in agent.skills_tags:
-            matched = True
-
-        # Check agent_card capabilities
-        capabilities = agent.agent_card.get("capabilities", [])
-        for cap in capabilities:
-            if cap.get("name") == request.capability:
-                matched = True
-                break
-
-        # Check agent_card skills
-        skills = agent.agent_card.get("skills", [])
-        for skill in skills:
-            if skill.get("id") == request.capability:
-                matched = True
-                break
-
-        if matched:
-            matching_agents.append(agent)
+    matching_agents = session.exec(statement).all()
 
     # Apply additional filters
     if request.filters:
@@ -135,15 +127,13 @@ async def discover_agents(
         for agent in matching_agents:
             # Filter by max_price
             if "max_price" in request.filters:
-                pricing = agent.agent_card.get("pricing", {})
-                agent_price = pricing.get("amount", 0)
+                agent_price = agent.card_pricing.get("amount", 0)
                 if agent_price > request.filters["max_price"]:
                     continue
 
             # Filter by location (if in metadata)
             if "location" in request.filters:
-                metadata = agent.agent_card.get("metadata", {})
-                agent_location = metadata.get("location", "")
+                agent_location = agent.card_metadata.get("location", "")
                 if request.filters["location"].lower() not in agent_location.lower():
                     continue
 
@@ -158,7 +148,7 @@ async def discover_agents(
             "agent_id": agent.agent_id,
             "name": agent.name,
             "reputation_score": agent.success_rate,  # Use success_rate as reputation for now
-            "pricing": agent.agent_card.get("pricing", {"model": "free", "amount": 0})
+            "pricing": agent.card_pricing or {"model": "free", "amount": 0}
         })
 
     return DiscoverResponse(agents=agents_response)
@@ -167,7 +157,7 @@ async def discover_agents(
 @router.post("/query", response_model=QueryResponse)
 async def query_agent(
     request: QueryRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     QUERY verb - Ask an agent a question or request information.
@@ -175,9 +165,9 @@ async def query_agent(
     This is a lightweight, non-binding request for information.
     No commitments are made in a QUERY.
     """
-    # Find the agent by DID
-    statement = select(RegisteredAgent).where(RegisteredAgent.did == request.agent_did)
-    agent = session.exec(statement).first()
+    # Find the agent by DID (TTL-cached; verb traffic re-resolves the
+    # same agents far more often than their rows change)
+    agent = await get_agent_cached(session, request.agent_did)
 
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent with DID {request.agent_did} not found")
@@ -186,15 +176,16 @@ async def query_agent(
         raise HTTPException(status_code=400, detail="Agent is not active")
 
     # Forward query to agent's endpoint
-    agent_url = agent.url
-    if not agent_url.endswith("/query"):
-        agent_url = f"{agent_url}/query"
+    agent_url = agent.query_url or f"{agent.url.rstrip('/')}/query"
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(agent_url, json=request.query)
-            response.raise_for_status()
-            agent_response = response.json()
+        response = await get_client().post(
+            agent_url,
+            content=orjson.dumps(request.query),
+            headers={"content-type": "application/json"}
+        )
+        response.raise_for_status()
+        agent_response = orjson.loads(response.content)
 
         return QueryResponse(
             agent_did=request.agent_did,
@@ -209,33 +200,94 @@ async def query_agent(
         )
 
 
+@router.post("/query_bulk", response_model=QueryBulkResponse)
+async def query_agents_bulk(
+    request: QueryBulkRequest,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    QUERY verb, batched - many queries in one client round-trip.
+
+    DIDs are resolved up front (sequentially - the shared session isn't
+    safe for concurrent use, and resolution is usually a TTL-cache hit),
+    then the agent forwards fan out concurrently over the pooled client.
+    Failures surface per entry as {"agent_did", "error"} so one bad
+    agent doesn't fail the whole batch. Results keep request order.
+    """
+    if len(request.queries) > 50:
+        raise HTTPException(status_code=413, detail="At most 50 queries per batch")
+
+    async def _forward(query_request: QueryRequest, agent) -> Dict[str, Any]:
+        agent_url = agent.query_url or f"{agent.url.rstrip('/')}/query"
+        try:
+            response = await get_client().post(
+                agent_url,
+                content=orjson.dumps(query_request.query),
+                headers={"content-type": "application/json"}
+            )
+            response.raise_for_status()
+            agent_response = orjson.loads(response.content)
+            return {
+                "agent_did": query_request.agent_did,
+                "response": agent_response,
+                "signature": agent_response.get("signature")
+            }
+        except httpx.HTTPError as e:
+            return {
+                "agent_did": query_request.agent_did,
+                "error": f"Failed to communicate with agent: {str(e)}"
+            }
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(request.queries)
+    forwards = []
+    for i, query_request in enumerate(request.queries):
+        agent = await get_agent_cached(session, query_request.agent_did)
+        if not agent:
+            results[i] = {
+                "agent_did": query_request.agent_did,
+                "error": f"Agent with DID {query_request.agent_did} not found"
+            }
+        elif not agent.is_active:
+            results[i] = {
+                "agent_did": query_request.agent_did,
+                "error": "Agent is not active"
+            }
+        else:
+            forwards.append((i, asyncio.ensure_future(_forward(query_request, agent))))
+
+    for i, forward in forwards:
+        results[i] = await forward
+
+    return QueryBulkResponse(results=results)
+
+
 @router.post("/propose", response_model=ProposeResponse)
 async def propose_to_agent(
     request: ProposeRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     PROPOSE verb - Make a formal proposal for a transaction.
 
     The agent can accept, reject, or counter-propose.
     """
-    # Find the agent
-    statement = select(RegisteredAgent).where(RegisteredAgent.did == request.agent_did)
-    agent = session.exec(statement).first()
+    # Find the agent (TTL-cached by DID)
+    agent = await get_agent_cached(session, request.agent_did)
 
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent with DID {request.agent_did} not found")
 
     # Forward proposal to agent's endpoint
-    agent_url = agent.url
-    if not agent_url.endswith("/propose"):
-        agent_url = f"{agent_url}/propose"
+    agent_url = agent.propose_url or f"{agent.url.rstrip('/')}/propose"
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(agent_url, json=request.proposal)
-            response.raise_for_status()
-            agent_response = response.json()
+        response = await get_client().post(
+            agent_url,
+            content=orjson.dumps(request.proposal),
+            headers={"content-type": "application/json"}
+        )
+        response.raise_for_status()
+        agent_response = orjson.loads(response.content)
 
         return ProposeResponse(
             proposal_id=agent_response.get("proposal_id"),
@@ -254,36 +306,33 @@ async def propose_to_agent(
 @router.post("/commit", response_model=CommitResponse)
 async def commit_proposal(
     request: CommitRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     COMMIT verb - Finalize an accepted proposal.
 
     This confirms the transaction and may include payment proof.
     """
-    # Find the agent
-    statement = select(RegisteredAgent).where(RegisteredAgent.did == request.agent_did)
-    agent = session.exec(statement).first()
+    # Find the agent (TTL-cached by DID)
+    agent = await get_agent_cached(session, request.agent_did)
 
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent with DID {request.agent_did} not found")
 
     # Forward commit to agent's endpoint
-    agent_url = agent.url
-    if not agent_url.endswith("/commit"):
-        agent_url = f"{agent_url}/commit"
+    agent_url = agent.commit_url or f"{agent.url.rstrip('/')}/commit"
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                agent_url,
-                json={
-                    "proposal_id": request.proposal_id,
-                    "payment_proof": request.payment_proof
-                }
-            )
-            response.raise_for_status()
-            agent_response = response.json()
+        response = await get_client().post(
+            agent_url,
+            content=orjson.dumps({
+                "proposal_id": request.proposal_id,
+                "payment_proof": request.payment_proof
+            }),
+            headers={"content-type": "application/json"}
+        )
+        response.raise_for_status()
+        agent_response = orjson.loads(response.content)
 
         return CommitResponse(
             commitment_id=agent_response.get("commitment_id"),
@@ -302,7 +351,7 @@ async def commit_proposal(
 @router.post("/cancel", response_model=CancelResponse)
 async def cancel_commitment(
     request: CancelRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     CANCEL verb - Cancel a committed transaction.
@@ -310,30 +359,27 @@ async def cancel_commitment(
     Can be initiated by either the client or the agent.
     May include refund processing.
     """
-    # Find the agent
-    statement = select(RegisteredAgent).where(RegisteredAgent.did == request.agent_did)
-    agent = session.exec(statement).first()
+    # Find the agent (TTL-cached by DID)
+    agent = await get_agent_cached(session, request.agent_did)
 
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent with DID {request.agent_did} not found")
 
     # Forward cancellation to agent's endpoint
-    agent_url = agent.url
-    if not agent_url.endswith("/cancel"):
-        agent_url = f"{agent_url}/cancel"
+    agent_url = agent.cancel_url or f"{agent.url.rstrip('/')}/cancel"
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                agent_url,
-                json={
-                    "commitment_id": request.commitment_id,
-                    "reason": request.reason,
-                    "refund_requested": request.refund_requested
-                }
-            )
-            response.raise_for_status()
-            agent_response = response.json()
+        response = await get_client().post(
+            agent_url,
+            content=orjson.dumps({
+                "commitment_id": request.commitment_id,
+                "reason": request.reason,
+                "refund_requested": request.refund_requested
+            }),
+            headers={"content-type": "application/json"}
+        )
+        response.raise_for_status()
+        agent_response = orjson.loads(response.content)
 
         return CancelResponse(
             status=agent_response.get("status"),
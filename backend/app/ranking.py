@@ -12,8 +12,19 @@ Strategies included:
 """
 
 from typing import List, Optional, Dict, Any
+from functools import lru_cache
 from .models import RegisteredAgent
-import math
+import numpy as np
+
+
+@lru_cache(maxsize=1)
+def _load_sentence_model():
+    """Load the MiniLM model once per process (None if unavailable)"""
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer('all-MiniLM-L6-v2')
+    except ImportError:
+        return None
 
 
 # ============================================
@@ -27,6 +38,19 @@ class RankingStrategy:
         """Score an agent (0-100 scale)"""
         raise NotImplementedError
 
+    def score_batch(self, agents: List[RegisteredAgent], query: str, skill_tags: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Score many agents at once (0-100 scale each).
+
+        Default implementation loops over score(); strategies override
+        this with vectorized versions for the hot ranking path.
+        """
+        return np.fromiter(
+            (self.score(agent, query, skill_tags) for agent in agents),
+            dtype=np.float64,
+            count=len(agents)
+        )
+
 
 class PerformanceRanking(RankingStrategy):
     """
@@ -36,25 +60,25 @@ class PerformanceRanking(RankingStrategy):
     Weights: Success rate (60%), Latency (30%), Popularity (10%)
     """
 
-    def score(self, agent: RegisteredAgent, query: str, skill_tags: Optional[List[str]] = None) -> float:
-        score = 0.0
+    def score_batch(self, agents: List[RegisteredAgent], query: str, skill_tags: Optional[List[str]] = None) -> np.ndarray:
+        n = len(agents)
+        success_rate = np.fromiter((a.success_rate for a in agents), dtype=np.float64, count=n)
+        latency = np.fromiter((a.avg_latency_ms for a in agents), dtype=np.float64, count=n)
+        total_calls = np.fromiter((a.total_calls for a in agents), dtype=np.float64, count=n)
 
         # Success rate (0-60 points)
-        score += agent.success_rate * 60
+        scores = success_rate * 60
+
+        # Latency (0-30 points, lower is better): 0ms=30pts, 5000ms=0pts
+        scores += np.where(latency > 0, np.clip(30 - (latency / 5000) * 30, 0, 30), 0.0)
 
-        # Latency (0-30 points, lower is better)
-        if agent.avg_latency_ms > 0:
-            # Convert to score: 0ms=30pts, 5000ms=0pts
-            latency_score = max(0, 30 - (agent.avg_latency_ms / 5000) * 30)
-            score += latency_score
+        # Popularity (0-10 points, logarithmic: popular agents get bonus)
+        scores += np.where(total_calls > 0, np.minimum(10, np.log10(total_calls + 1) * 2), 0.0)
 
-        # Popularity (0-10 points)
-        # Logarithmic scale: popular agents get bonus
-        if agent.total_calls > 0:
-            popularity_score = min(10, math.log10(agent.total_calls + 1) * 2)
-            score += popularity_score
+        return scores
 
-        return score
+    def score(self, agent: RegisteredAgent, query: str, skill_tags: Optional[List[str]] = None) -> float:
+        return float(self.score_batch([agent], query, skill_tags)[0])
 
 
 class SemanticRanking(RankingStrategy):
@@ -68,34 +92,134 @@ class SemanticRanking(RankingStrategy):
     """
 
     def __init__(self):
-        # Try to load model, fallback to simple matching
-        try:
-            from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            self.use_embeddings = True
-        except ImportError:
-            self.use_embeddings = False
+        # Try to load model (cached per process), fallback to simple matching
+        self.model = _load_sentence_model()
+        self.use_embeddings = self.model is not None
+        if not self.use_embeddings:
             print("[RANKING] sentence-transformers not installed, using simple keyword matching")
 
-    def score(self, agent: RegisteredAgent, query: str, skill_tags: Optional[List[str]] = None) -> float:
-        if self.use_embeddings:
-            return self._score_with_embeddings(agent, query)
-        else:
-            return self._score_with_keywords(agent, query)
+        # Agent embeddings keyed by (agent_id, description hash) so an
+        # updated description re-encodes but repeat rankings don't.
+        # Stored int8-quantized: (vector, scale, fp32 norm) - quarter the
+        # memory traffic of fp32 when scoring a large registry.
+        self._embedding_cache: Dict[Any, tuple] = {}
 
-    def _score_with_embeddings(self, agent: RegisteredAgent, query: str) -> float:
-        """Use semantic embeddings (requires sentence-transformers)"""
-        from sentence_transformers import util
+        # Optional ANN index (hnswlib) over the cached embeddings. Brute
+        # force is fine for hundreds of agents; O(log N) graph search wins
+        # once the candidate set grows into the thousands.
+        try:
+            import hnswlib
+            self._hnswlib = hnswlib
+        except ImportError:
+            self._hnswlib = None
+        self._ann_index = None
+        self._ann_key_for_label: Dict[int, Any] = {}
 
-        # Embed query and agent description
-        query_emb = self.model.encode(query, convert_to_tensor=True)
-        desc_emb = self.model.encode(agent.description, convert_to_tensor=True)
+    # Below this many candidates the int8 matmul beats graph traversal
+    ANN_MIN_CANDIDATES = 1000
 
-        # Cosine similarity (0-1)
-        similarity = util.cos_sim(query_emb, desc_emb).item()
+    def score_batch(self, agents: List[RegisteredAgent], query: str, skill_tags: Optional[List[str]] = None) -> np.ndarray:
+        if not agents:
+            return np.empty(0, dtype=np.float64)
+        if self.use_embeddings:
+            return self._score_with_embeddings_batch(agents, query)
+        return np.fromiter(
+            (self._score_with_keywords(agent, query) for agent in agents),
+            dtype=np.float64,
+            count=len(agents)
+        )
 
-        # Convert to 0-100 scale
-        return similarity * 100
+    def score(self, agent: RegisteredAgent, query: str, skill_tags: Optional[List[str]] = None) -> float:
+        return float(self.score_batch([agent], query, skill_tags)[0])
+
+    @staticmethod
+    def _quantize(emb: np.ndarray) -> tuple:
+        """Quantize an fp32 embedding to int8 with a per-vector scale"""
+        scale = float(np.abs(emb).max()) / 127.0
+        if scale == 0.0:
+            scale = 1.0
+        quantized = np.round(emb / scale).astype(np.int8)
+        return quantized, scale, float(np.linalg.norm(emb))
+
+    def _score_with_embeddings_batch(self, agents: List[RegisteredAgent], query: str) -> np.ndarray:
+        """
+        Cosine similarity of the query against all agent descriptions.
+
+        The query is encoded once and any uncached descriptions in one
+        batched forward pass, instead of one model call per agent. Dot
+        products run int8->int32 and are rescaled by the stored per-vector
+        scales and norms.
+        """
+        keys = [(agent.agent_id, hash(agent.description)) for agent in agents]
+
+        missing = [i for i, key in enumerate(keys) if key not in self._embedding_cache]
+        if missing:
+            if len(self._embedding_cache) > 20_000:
+                self._embedding_cache.clear()
+                self._ann_index = None
+                self._ann_key_for_label.clear()
+            encoded = self.model.encode(
+                [agents[i].description for i in missing],
+                batch_size=64,
+                convert_to_numpy=True
+            )
+            for i, emb in zip(missing, encoded):
+                self._embedding_cache[keys[i]] = self._quantize(emb)
+                self._ann_add(keys[i], emb)
+
+        query_emb = self.model.encode(query, convert_to_numpy=True)
+
+        # Large candidate sets: approximate top-k via the HNSW graph
+        # instead of an O(N*d) matmul over every agent
+        if self._ann_index is not None and len(agents) >= self.ANN_MIN_CANDIDATES:
+            return self._ann_scores(keys, query_emb)
+
+        cached = [self._embedding_cache[key] for key in keys]
+        desc_embs = np.stack([c[0] for c in cached])
+        desc_scales = np.fromiter((c[1] for c in cached), dtype=np.float64, count=len(cached))
+        desc_norms = np.fromiter((c[2] for c in cached), dtype=np.float64, count=len(cached))
+
+        query_q, query_scale, query_norm = self._quantize(query_emb)
+
+        # Cosine similarity (0-1), converted to 0-100 scale
+        dots = desc_embs.astype(np.int32) @ query_q.astype(np.int32)
+        sims = dots * desc_scales * query_scale / (desc_norms * query_norm + 1e-12)
+        return sims * 100
+
+    def _ann_add(self, key: Any, emb: np.ndarray) -> None:
+        """Insert an embedding into the HNSW index (if hnswlib is present)"""
+        if self._hnswlib is None:
+            return
+
+        if self._ann_index is None:
+            self._ann_index = self._hnswlib.Index(space="cosine", dim=emb.shape[0])
+            self._ann_index.init_index(max_elements=2048, M=32, ef_construction=200)
+            self._ann_index.set_ef(64)
+
+        if self._ann_index.get_current_count() >= self._ann_index.get_max_elements():
+            self._ann_index.resize_index(self._ann_index.get_max_elements() * 2)
+
+        label = self._ann_index.get_current_count()
+        self._ann_index.add_items(emb.reshape(1, -1), np.array([label]))
+        self._ann_key_for_label[label] = key
+
+    def _ann_scores(self, keys: List[Any], query_emb: np.ndarray) -> np.ndarray:
+        """
+        Approximate semantic scores: search the index for the query's
+        nearest neighbors and give everything outside the top-k a floor
+        score, so distant agents still rank via the other components.
+        """
+        position_for_key = {key: i for i, key in enumerate(keys)}
+        k = min(self._ann_index.get_current_count(), max(100, len(keys) // 10))
+
+        labels, distances = self._ann_index.knn_query(query_emb.reshape(1, -1), k=k)
+
+        scores = np.zeros(len(keys), dtype=np.float64)
+        for label, distance in zip(labels[0], distances[0]):
+            position = position_for_key.get(self._ann_key_for_label.get(int(label)))
+            if position is not None:
+                scores[position] = (1.0 - distance) * 100
+        return scores
 
     def _score_with_keywords(self, agent: RegisteredAgent, query: str) -> float:
         """Simple keyword matching fallback"""
@@ -130,26 +254,31 @@ class RevenueRanking(RankingStrategy):
     Premium agents (paid tier) rank higher
     """
 
-    def score(self, agent: RegisteredAgent, query: str, skill_tags: Optional[List[str]] = None) -> float:
-        score = 0.0
+    # Tier bonuses
+    TIER_SCORES = {
+        "enterprise": 100,
+        "premium": 70,
+        "pro": 40,
+        "free": 0
+    }
 
-        # Check agent metadata for tier
-        tier = agent.agent_card.get("metadata", {}).get("tier", "free")
-
-        # Tier bonuses
-        tier_scores = {
-            "enterprise": 100,
-            "premium": 70,
-            "pro": 40,
-            "free": 0
-        }
+    def score_batch(self, agents: List[RegisteredAgent], query: str, skill_tags: Optional[List[str]] = None) -> np.ndarray:
+        n = len(agents)
 
-        score += tier_scores.get(tier, 0)
+        # Check agent metadata for tier
+        tier_scores = np.fromiter(
+            (self.TIER_SCORES.get(a.card_metadata.get("tier", "free"), 0) for a in agents),
+            dtype=np.float64,
+            count=n
+        )
 
         # Add small performance bonus (so good free agents can compete)
-        score += agent.success_rate * 10
+        success_rate = np.fromiter((a.success_rate for a in agents), dtype=np.float64, count=n)
+
+        return tier_scores + success_rate * 10
 
-        return score
+    def score(self, agent: RegisteredAgent, query: str, skill_tags: Optional[List[str]] = None) -> float:
+        return float(self.score_batch([agent], query, skill_tags)[0])
 
 
 class HybridRanking(RankingStrategy):
@@ -167,10 +296,10 @@ class HybridRanking(RankingStrategy):
     - Freshness: 5%
     """
 
-    def __init__(self):
-        self.performance_ranker = PerformanceRanking()
-        self.semantic_ranker = SemanticRanking()
-        self.revenue_ranker = RevenueRanking()
+    def __init__(self, performance_ranker=None, semantic_ranker=None, revenue_ranker=None):
+        self.performance_ranker = performance_ranker or PerformanceRanking()
+        self.semantic_ranker = semantic_ranker or SemanticRanking()
+        self.revenue_ranker = revenue_ranker or RevenueRanking()
 
         # Weights (tune these!)
         self.weights = {
@@ -181,62 +310,74 @@ class HybridRanking(RankingStrategy):
             "freshness": 0.05
         }
 
-    def score(self, agent: RegisteredAgent, query: str, skill_tags: Optional[List[str]] = None) -> float:
-        # Component scores
-        skill_score = self._skill_match_score(agent, skill_tags)
-        performance_score = self.performance_ranker.score(agent, query, skill_tags)
-        semantic_score = self.semantic_ranker.score(agent, query, skill_tags)
-        revenue_score = self.revenue_ranker.score(agent, query, skill_tags)
-        freshness_score = self._freshness_score(agent)
+    def score_batch(self, agents: List[RegisteredAgent], query: str, skill_tags: Optional[List[str]] = None) -> np.ndarray:
+        # Component score vectors (one pass over the candidate list each)
+        skill_scores = self._skill_match_batch(agents, skill_tags)
+        performance_scores = self.performance_ranker.score_batch(agents, query, skill_tags)
+        semantic_scores = self.semantic_ranker.score_batch(agents, query, skill_tags)
+        revenue_scores = self.revenue_ranker.score_batch(agents, query, skill_tags)
+        freshness_scores = self._freshness_batch(agents)
 
         # Weighted combination
-        total_score = (
-            skill_score * self.weights["skill_match"] +
-            performance_score * self.weights["performance"] +
-            semantic_score * self.weights["semantic"] +
-            revenue_score * self.weights["revenue"] +
-            freshness_score * self.weights["freshness"]
+        return (
+            skill_scores * self.weights["skill_match"] +
+            performance_scores * self.weights["performance"] +
+            semantic_scores * self.weights["semantic"] +
+            revenue_scores * self.weights["revenue"] +
+            freshness_scores * self.weights["freshness"]
         )
 
-        return total_score
+    def score(self, agent: RegisteredAgent, query: str, skill_tags: Optional[List[str]] = None) -> float:
+        return float(self.score_batch([agent], query, skill_tags)[0])
 
-    def _skill_match_score(self, agent: RegisteredAgent, skill_tags: Optional[List[str]]) -> float:
-        """Score based on skill tag matching"""
+    def _skill_match_batch(self, agents: List[RegisteredAgent], skill_tags: Optional[List[str]]) -> np.ndarray:
+        """Score based on skill tag matching (Jaccard similarity)"""
         if not skill_tags:
-            return 50  # Neutral if no tags specified
+            return np.full(len(agents), 50.0)  # Neutral if no tags specified
 
-        agent_tags = set(agent.skills_tags)
-        query_tags = set(skill_tags)
+        query_tags = frozenset(skill_tags)
 
-        if len(query_tags) == 0:
-            return 50
+        def jaccard(agent: RegisteredAgent) -> float:
+            agent_tags = agent.skills_tag_set
+            union = len(agent_tags | query_tags)
+            if union == 0:
+                return 0.0
+            return len(agent_tags & query_tags) / union * 100
 
-        # Jaccard similarity
-        intersection = agent_tags & query_tags
-        union = agent_tags | query_tags
+        return np.fromiter((jaccard(a) for a in agents), dtype=np.float64, count=len(agents))
 
-        if len(union) == 0:
-            return 0
-
-        similarity = len(intersection) / len(union)
-        return similarity * 100
-
-    def _freshness_score(self, agent: RegisteredAgent) -> float:
+    def _freshness_batch(self, agents: List[RegisteredAgent]) -> np.ndarray:
         """Newer agents get a small boost (encourages new entrants)"""
         # TODO: Calculate days since registration
         # For now, return neutral
-        return 50
+        return np.full(len(agents), 50.0)
 
 
 # ============================================
 # MAIN RANKING FUNCTION
 # ============================================
 
+# Module-level singletons: rankers are stateless apart from their caches
+# (embeddings, ANN index), which only pay off if they live across requests.
+# Instantiating SemanticRanking per call would reload the model each time.
+_PERFORMANCE_RANKER = PerformanceRanking()
+_SEMANTIC_RANKER = SemanticRanking()
+_REVENUE_RANKER = RevenueRanking()
+_HYBRID_RANKER = HybridRanking(_PERFORMANCE_RANKER, _SEMANTIC_RANKER, _REVENUE_RANKER)
+
+_STRATEGIES = {
+    "performance": _PERFORMANCE_RANKER,
+    "semantic": _SEMANTIC_RANKER,
+    "revenue": _REVENUE_RANKER,
+    "hybrid": _HYBRID_RANKER
+}
+
 def rank_agents(
     agents: List[RegisteredAgent],
     query: str,
     skill_tags: Optional[List[str]] = None,
-    strategy: str = "hybrid"
+    strategy: str = "hybrid",
+    top_k: Optional[int] = None
 ) -> List[RegisteredAgent]:
     """
     Rank agents using specified strategy.
@@ -246,28 +387,28 @@ def rank_agents(
         query: User query
         skill_tags: Optional skill tags to filter/rank by
         strategy: "performance", "semantic", "revenue", or "hybrid" (default)
+        top_k: If set, return only the best top_k agents (partial
+            selection - O(N) instead of a full O(N log N) sort)
 
     Returns:
         Sorted list of agents (best first)
     """
     # Select ranking strategy
-    strategies = {
-        "performance": PerformanceRanking(),
-        "semantic": SemanticRanking(),
-        "revenue": RevenueRanking(),
-        "hybrid": HybridRanking()
-    }
+    ranker = _STRATEGIES.get(strategy, _HYBRID_RANKER)
 
-    ranker = strategies.get(strategy, HybridRanking())
+    if not agents:
+        return []
 
-    # Score all agents
-    scored_agents = []
-    for agent in agents:
-        score = ranker.score(agent, query, skill_tags)
-        scored_agents.append((agent, score))
+    # Score all agents in one vectorized pass
+    scores = ranker.score_batch(agents, query, skill_tags)
 
-    # Sort by score descending
-    scored_agents.sort(key=lambda x: x[1], reverse=True)
+    # Callers that only consume the top of the ranking (orchestrate takes
+    # max_agents) don't pay for sorting the tail: argpartition selects the
+    # k best unordered, then only that slice gets sorted
+    if top_k is not None and top_k < len(agents):
+        candidate_idx = np.argpartition(-scores, top_k - 1)[:top_k]
+        order = candidate_idx[np.argsort(-scores[candidate_idx], kind="stable")]
+    else:
+        order = np.argsort(-scores, kind="stable")
 
-    # Return sorted agents
-    return [agent for agent, score in scored_agents]
+    return [agents[i] for i in order]
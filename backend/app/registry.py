@@ -4,17 +4,21 @@ Poros Protocol - Agent Registry (A2P: Agent-to-Platform)
 Handles agent registration, AgentCard storage, and discovery.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import select, Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlmodel import select, Session, func, or_
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
-from datetime import datetime
+import asyncio
 
 from .models import (
     User, UserCreate, Token,
-    RegisteredAgent, AgentCardSubmit, AgentCardResponse
+    RegisteredAgent, AgentCardSubmit, AgentCardResponse,
+    AgentCardSummaryResponse, AgentSkillTag, extract_agent_tags, utcnow
 )
 from .database import get_session
 from .auth import hash_password, verify_password, create_access_token, get_current_user
+from .agent_by_did import invalidate as invalidate_did_cache
 
 router = APIRouter(prefix="/api/registry", tags=["Agent Registry"])
 
@@ -44,8 +48,8 @@ async def create_user(
             detail="Username already exists"
         )
 
-    # Create user
-    hashed = hash_password(user_data.password)
+    # Create user (bcrypt is CPU-bound - run off the event loop)
+    hashed = await asyncio.to_thread(hash_password, user_data.password)
     user = User(
         username=user_data.username,
         email=user_data.email,
@@ -77,7 +81,7 @@ async def login(
         select(User).where(User.username == username)
     ).first()
 
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await asyncio.to_thread(verify_password, password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -103,7 +107,7 @@ async def login(
 # ============================================
 
 @router.post("/agents", response_model=AgentCardResponse, status_code=status.HTTP_201_CREATED)
-async def register_agent(
+def register_agent(
     submission: AgentCardSubmit,
     current_user: dict = Depends(get_current_user),
     session: Session = Depends(get_session)
@@ -143,17 +147,6 @@ async def register_agent(
     if not agent_id:
         agent_id = f"{current_user['sub']}/{name.lower().replace(' ', '-')}"
 
-    # Check if agent_id already exists
-    existing = session.exec(
-        select(RegisteredAgent).where(RegisteredAgent.agent_id == agent_id)
-    ).first()
-
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Agent ID '{agent_id}' already registered"
-        )
-
     # Extract skill tags for indexing
     skills = agent_card.get("skills", [])
     skills_tags = []
@@ -168,6 +161,10 @@ async def register_agent(
     # Extract DID from agent card (for Poros Protocol v2)
     did = agent_card.get("did")
 
+    # Precompute verb endpoints once (normalize the trailing slash here
+    # so forwarding paths never re-suffix per call)
+    base_url = url.rstrip("/")
+
     agent = RegisteredAgent(
         agent_id=agent_id,
         did=did,  # Store the DID!
@@ -177,40 +174,56 @@ async def register_agent(
         description=description,
         url=url,
         preferred_transport=preferred_transport,
+        query_url=f"{base_url}/query",
+        propose_url=f"{base_url}/propose",
+        commit_url=f"{base_url}/commit",
+        cancel_url=f"{base_url}/cancel",
         skills_tags=skills_tags,
         is_active=True,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
+        created_at=utcnow(),
+        updated_at=utcnow()
     )
 
     session.add(agent)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        # agent_id carries a UNIQUE constraint - letting the insert trip
+        # it is race-free and skips a priming SELECT (which pulled the
+        # full row + JSON card just to probe existence)
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Agent ID '{agent_id}' already registered"
+        )
     session.refresh(agent)
 
-    return AgentCardResponse(
-        id=agent.id,
-        agent_id=agent.agent_id,
-        did=agent.did,  # Include DID in response
-        owner_id=agent.owner_id,
-        name=agent.name,
-        description=agent.description,
-        url=agent.url,
-        agent_card=agent.agent_card,
-        is_active=agent.is_active,
-        created_at=agent.created_at
-    )
+    # Denormalize tags for indexed discovery (skill tags + capability
+    # names + skill ids - everything discover/orchestrate match against)
+    for tag in extract_agent_tags(agent_card, skills_tags):
+        session.add(AgentSkillTag(agent_id=agent.id, tag=tag))
+    session.commit()
+
+    # Drop any stale verb-path cache entry for this DID
+    invalidate_did_cache(did)
+
+    # response_model converts the row via from_attributes
+    return agent
 
 
 # ============================================
 # AGENT DISCOVERY
 # ============================================
 
-@router.get("/agents", response_model=List[AgentCardResponse])
-async def list_agents(
+@router.get("/agents", response_model=List[AgentCardSummaryResponse])
+def list_agents(
+    response: Response,
     skill_tag: Optional[str] = Query(None, description="Filter by skill tag"),
     name_search: Optional[str] = Query(None, description="Search by name or description"),
     active_only: bool = Query(True, description="Only show active agents"),
     limit: int = Query(50, le=100),
+    offset: int = Query(0, ge=0, description="Skip this many agents (pagination)"),
+    include_total: bool = Query(False, description="Report the total match count in the X-Total-Count header"),
     session: Session = Depends(get_session)
 ):
     """
@@ -220,49 +233,110 @@ async def list_agents(
     - skill_tag: Find agents with specific skill tags (e.g., "hotel_booking")
     - name_search: Text search in agent name/description
     - active_only: Only return active agents
+
+    Paginate with limit/offset; pass include_total=true to get the
+    unpaginated match count in the X-Total-Count response header.
+
+    Returns summary rows (no agent_card JSON - the widest column by
+    far); fetch /agents/{agent_id} for an agent's full card.
     """
-    query = select(RegisteredAgent)
+    # Column select, not ORM hydration: tuples are cheaper to build and
+    # the is_active filter rides the (is_active, agent_id) index
+    query = select(
+        RegisteredAgent.id,
+        RegisteredAgent.agent_id,
+        RegisteredAgent.did,
+        RegisteredAgent.name,
+        RegisteredAgent.description,
+        RegisteredAgent.url,
+        RegisteredAgent.is_active,
+        RegisteredAgent.created_at,
+    )
 
     # Filter by active status
     if active_only:
         query = query.where(RegisteredAgent.is_active == True)
 
-    # Execute and get all results
-    agents = session.exec(query).all()
-
-    # Filter by skill tag (in Python since we store as JSON array)
+    # Filter by skill tag via the indexed tag table (no Python scan over
+    # every agent's JSON array)
     if skill_tag:
-        agents = [a for a in agents if skill_tag in a.skills_tags]
+        query = query.where(
+            RegisteredAgent.id.in_(
+                select(AgentSkillTag.agent_id).where(AgentSkillTag.tag == skill_tag)
+            )
+        )
 
-    # Filter by name search
+    # Filter by name search, pushed into SQL so non-matching rows never
+    # leave the database
     if name_search:
-        search_lower = name_search.lower()
-        agents = [
-            a for a in agents
-            if search_lower in a.name.lower() or search_lower in a.description.lower()
-        ]
-
-    # Limit results
-    agents = agents[:limit]
-
-    return [
-        AgentCardResponse(
-            id=a.id,
-            agent_id=a.agent_id,
-            owner_id=a.owner_id,
-            name=a.name,
-            description=a.description,
-            url=a.url,
-            agent_card=a.agent_card,
-            is_active=a.is_active,
-            created_at=a.created_at
+        pattern = f"%{name_search}%"
+        query = query.where(
+            or_(
+                RegisteredAgent.name.ilike(pattern),
+                RegisteredAgent.description.ilike(pattern)
+            )
         )
-        for a in agents
-    ]
+
+    # Count is a separate cheap query, and only when asked for - the
+    # common page fetch shouldn't pay for a full-table aggregate
+    if include_total:
+        total = session.exec(
+            select(func.count()).select_from(query.subquery())
+        ).one()
+        response.headers["X-Total-Count"] = str(total)
+
+    # Paginate in SQL - only the returned page is ever hydrated; the
+    # response_model validates rows directly (no per-field repack)
+    return session.exec(query.offset(offset).limit(limit)).all()
+
+
+@router.get("/agents/autocomplete", response_model=List[AgentCardSummaryResponse])
+def autocomplete_agents(
+    prefix: str = Query(..., min_length=1, max_length=64, description="Name prefix to complete"),
+    limit: int = Query(10, le=25),
+    session: Session = Depends(get_session)
+):
+    """
+    Fast name autocomplete for discovery UIs.
+
+    Short prefixes (<4 chars) match the start of the name only - a
+    prefix-anchored LIKE rides the existing name index. Longer inputs
+    widen to substring matches over name and description.
+
+    On Postgres, substring matching should be backed by a trigram index
+    (create_all can't ship extensions, so this is a one-time manual step):
+
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX idx_agent_name_trgm ON registered_agents
+            USING gin (name gin_trgm_ops, description gin_trgm_ops);
+    """
+    query = select(
+        RegisteredAgent.id,
+        RegisteredAgent.agent_id,
+        RegisteredAgent.did,
+        RegisteredAgent.name,
+        RegisteredAgent.description,
+        RegisteredAgent.url,
+        RegisteredAgent.is_active,
+        RegisteredAgent.created_at,
+    ).where(RegisteredAgent.is_active == True)
+
+    if len(prefix) < 4:
+        query = query.where(RegisteredAgent.name.ilike(f"{prefix}%"))
+    else:
+        pattern = f"%{prefix}%"
+        query = query.where(
+            or_(
+                RegisteredAgent.name.ilike(pattern),
+                RegisteredAgent.description.ilike(pattern)
+            )
+        )
+
+    return session.exec(query.limit(limit)).all()
 
 
 @router.get("/agents/{agent_id}", response_model=AgentCardResponse)
-async def get_agent(
+def get_agent(
     agent_id: str,
     session: Session = Depends(get_session)
 ):
@@ -279,22 +353,11 @@ async def get_agent(
             detail=f"Agent '{agent_id}' not found"
         )
 
-    return AgentCardResponse(
-        id=agent.id,
-        agent_id=agent.agent_id,
-        did=agent.did,  # Include DID in response
-        owner_id=agent.owner_id,
-        name=agent.name,
-        description=agent.description,
-        url=agent.url,
-        agent_card=agent.agent_card,
-        is_active=agent.is_active,
-        created_at=agent.created_at
-    )
+    return agent
 
 
 @router.delete("/agents/{agent_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_agent(
+def delete_agent(
     agent_id: str,
     current_user: dict = Depends(get_current_user),
     session: Session = Depends(get_session)
@@ -302,24 +365,39 @@ async def delete_agent(
     """
     Delete an agent (only owner can delete).
     """
-    agent = session.exec(
-        select(RegisteredAgent).where(RegisteredAgent.agent_id == agent_id)
-    ).first()
-
-    if not agent:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Agent '{agent_id}' not found"
+    # Resolve pk + did with the ownership check folded into the WHERE.
+    # The tag rows must be deleted before the agent row - their
+    # agent_id carries a foreign key to registered_agents.id, which
+    # Postgres enforces immediately - so a DELETE ... RETURNING on the
+    # parent alone can't work here.
+    deleted = session.exec(
+        select(RegisteredAgent.id, RegisteredAgent.did).where(
+            RegisteredAgent.agent_id == agent_id,
+            RegisteredAgent.owner_id == current_user["user_id"]
         )
+    ).first()
 
-    # Check ownership
-    if agent.owner_id != current_user["user_id"]:
+    if deleted is None:
+        # Nothing matched - a cheap existence probe tells 404 from 403
+        exists = session.exec(
+            select(RegisteredAgent.id).where(RegisteredAgent.agent_id == agent_id)
+        ).first()
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Agent '{agent_id}' not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't own this agent"
         )
 
-    session.delete(agent)
+    # Children first, then the agent row, one commit
+    session.execute(delete(AgentSkillTag).where(AgentSkillTag.agent_id == deleted.id))
+    session.execute(delete(RegisteredAgent).where(RegisteredAgent.id == deleted.id))
     session.commit()
 
+    # Verb endpoints must stop resolving the deleted DID immediately
+    invalidate_did_cache(deleted.did)
+
     return None
@@ -3,14 +3,23 @@
 Railway startup script - reads PORT from environment
 """
 import os
-import subprocess
 
-port = os.environ.get("PORT", "8000")
+import uvicorn
+
+from app.main import app
+
+port = int(os.environ.get("PORT", "8000"))
 print(f"Starting Poros Protocol on port {port}")
 
-subprocess.run([
-    "uvicorn",
-    "app.main:app",
-    "--host", "0.0.0.0",
-    "--port", port
-])
+# Run uvicorn in-process: no child interpreter to cold-start, and SIGTERM
+# from the platform reaches the server directly instead of orphaning a
+# subprocess. uvloop/httptools come with uvicorn[standard]; access logs
+# are skipped - Railway already aggregates request logs upstream.
+uvicorn.run(
+    app,
+    host="0.0.0.0",
+    port=port,
+    loop="uvloop",
+    http="httptools",
+    access_log=False,
+)
@@ -2,7 +2,9 @@
 Test script for identity module - DID generation and signature verification
 """
 
-from app.identity import generate_keypair, sign_agent_card, verify_agent_card
+from app.identity import (
+    generate_keypair, sign_agent_card, verify_agent_card, verify_agent_cards_batch
+)
 
 # Test 1: Generate a keypair
 print("=" * 60)
@@ -65,6 +67,16 @@ is_valid_tampered = verify_agent_card(tampered_card, signature, did)
 print(f"✓ Signature valid for tampered data: {is_valid_tampered}")
 print()
 
+# Test 6: Batch verification (thread-pooled - cryptography releases the GIL)
+print("=" * 60)
+print("TEST 6: Batch Verify 100 Cards")
+print("=" * 60)
+
+is_valid_list = verify_agent_cards_batch([(agent_card, signature, did)] * 100)
+batch_ok = all(is_valid_list) and len(is_valid_list) == 100
+print(f"✓ Batch of 100 all valid: {batch_ok}")
+print()
+
 # Summary
 print("=" * 60)
 print("SUMMARY")
@@ -74,9 +86,10 @@ print(f"✓ AgentCard signing: PASS")
 print(f"✓ Valid signature verification: {'PASS' if is_valid else 'FAIL'}")
 print(f"✓ Wrong DID rejection: {'PASS' if not is_valid_wrong else 'FAIL'}")
 print(f"✓ Tampered data rejection: {'PASS' if not is_valid_tampered else 'FAIL'}")
+print(f"✓ Batch verification: {'PASS' if batch_ok else 'FAIL'}")
 print()
 
-if is_valid and not is_valid_wrong and not is_valid_tampered:
+if is_valid and not is_valid_wrong and not is_valid_tampered and batch_ok:
     print("🎉 ALL TESTS PASSED! Identity module is working correctly.")
 else:
     print("❌ SOME TESTS FAILED!")
@@ -3,25 +3,47 @@ FastAPI server for Intelligent Client Agent
 Provides a chat API that the frontend can call
 """
 
+import asyncio
+import orjson
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from intelligent_client import IntelligentClient
+from cachetools import TTLCache
+from intelligent_client import IntelligentClient, get_http_client, close_http_client
 import uvicorn
 
-app = FastAPI(title="Poros Client Agent API")
+app = FastAPI(title="Poros Client Agent API", default_response_class=ORJSONResponse)
 
 # CORS - allow all origins
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    # Same compiled allowlist as the backend: frontend deployments
+    # (Vercel) plus local dev. Explicit method/header lists let the
+    # middleware precompute preflight headers at startup.
+    allow_origin_regex=r"^(https://([a-z0-9-]+\.)?vercel\.app|http://(localhost|127\.0\.0\.1)(:\d+)?)$",
     allow_credentials=False,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["content-type"],
 )
 
-# Store client instances per session (in production, use Redis/DB)
-clients = {}
+# Store client instances per session (in production, use Redis/DB).
+# TTL + LRU bound the dict so idle sessions are evicted instead of
+# accumulating conversation history until the process OOMs.
+clients = TTLCache(maxsize=10_000, ttl=3600)
+clients_lock = asyncio.Lock()
+
+
+@app.on_event("startup")
+async def startup():
+    # Warm the shared outbound HTTP pool before the first chat turn
+    get_http_client()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_http_client()
 
 
 class ChatRequest(BaseModel):
@@ -39,10 +61,10 @@ async def chat(request: ChatRequest):
     """Send a message to the intelligent client agent"""
 
     # Get or create client for this session
-    if request.session_id not in clients:
-        clients[request.session_id] = IntelligentClient()
-
-    client = clients[request.session_id]
+    async with clients_lock:
+        client = clients.get(request.session_id)
+        if client is None:
+            client = clients[request.session_id] = IntelligentClient()
 
     # Process the message
     response = await client.process_message(request.message)
@@ -53,6 +75,27 @@ async def chat(request: ChatRequest):
     )
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat: Server-Sent Events with one JSON payload per chunk,
+    terminated by [DONE]. First token arrives as soon as Gemini emits it
+    instead of after the full generation.
+    """
+    async with clients_lock:
+        client = clients.get(request.session_id)
+        if client is None:
+            client = clients[request.session_id] = IntelligentClient()
+
+    async def event_stream():
+        async for chunk in client.stream_message(request.message):
+            # JSON-frame each chunk so embedded newlines can't break SSE
+            yield f"data: {orjson.dumps({'text': chunk}).decode()}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
@@ -0,0 +1,37 @@
+"""
+Shared httpx connection pool for the pilot / smart-client CLIs.
+
+Every plan step hits the same Railway backend, so one keep-alive HTTP/2
+client per process multiplexes all discover/query traffic over a warm
+connection instead of paying a TCP+TLS handshake per request.
+"""
+
+from typing import Optional
+
+import httpx
+
+_http: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled client, created on first use"""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+    return _http
+
+
+async def close_http_client() -> None:
+    """Drain the pool - call once at process shutdown"""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
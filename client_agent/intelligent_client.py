@@ -11,8 +11,12 @@ This agent acts as the user-facing interface that:
 """
 
 import os
-import json
+import re
+import time
+import asyncio
 import httpx
+import orjson
+from collections import deque
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
@@ -22,54 +26,159 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Use v1beta API with Gemini 2.0 (1.5 is retired)
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent"
+GEMINI_STREAM_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:streamGenerateContent"
 
 POROS_API_URL = os.getenv("POROS_API_URL", "https://poros-protocol-production.up.railway.app")
 
+# Smalltalk prefilter: greetings/thanks/goodbyes are a meaningful slice
+# of chat traffic and don't need a 1-3s Gemini round-trip to answer
+_TRIVIAL_RE = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|bye|goodbye)[\s!.?]*$",
+    re.IGNORECASE
+)
+
+
+def _trivial_response(user_message: str) -> Optional[str]:
+    """Canned reply for trivial smalltalk, or None if the LLM is needed"""
+    match = _TRIVIAL_RE.match(user_message)
+    if not match:
+        return None
+
+    word = match.group(1).lower()
+    if word in ("bye", "goodbye"):
+        return "Goodbye! Come back any time."
+    if word in ("thanks", "thank you"):
+        return "You're welcome! Anything else I can help with?"
+    return "Hi! I can help you discover and use agents in the Poros marketplace. What do you need?"
+
+# Shared HTTP client: one keep-alive pool for all Poros and Gemini calls
+# instead of a fresh TCP+TLS handshake per request
+_http: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily on first use"""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32
+            )
+        )
+    return _http
+
+
+async def close_http_client() -> None:
+    """Close the shared client (called from the API shutdown event)"""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
 
 class IntelligentClient:
     """
     Gemini-powered client that understands user intent and orchestrates agent calls
     """
 
+    # Registry snapshot shared across sessions: the marketplace changes
+    # on human timescales, not per chat message, so there's no reason to
+    # re-fetch it before every Gemini call
+    _agents_cache: Optional[tuple] = None  # (monotonic ts, agents, by_id, skill_names_by_id)
+    _AGENTS_CACHE_TTL = 30.0
+
+    # Formatted prompt block for the current registry snapshot, keyed by
+    # the snapshot list's identity (discover_agents hands out the same
+    # list object for the cache's lifetime)
+    _llm_block_cache: Optional[tuple] = None  # (agents list, formatted str)
+
     def __init__(self):
-        self.conversation_history = []
+        # Bounded: prompts only ever read the tail, so old turns are
+        # dead weight that would grow without limit in long sessions
+        self.conversation_history = deque(maxlen=20)
         self.user_preferences = {}
         self.discovered_agents = []
+        self._agents_by_id = {}
+        self._skill_names_by_id = {}
 
     async def discover_agents(self) -> List[Dict]:
-        """Fetch all available agents from Poros Protocol"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{POROS_API_URL}/api/registry/agents")
-            self.discovered_agents = response.json()
+        """Fetch all available agents from Poros Protocol (TTL-cached)"""
+        now = time.monotonic()
+        cache = IntelligentClient._agents_cache
+        if cache is not None and now - cache[0] < self._AGENTS_CACHE_TTL:
+            _, self.discovered_agents, self._agents_by_id, self._skill_names_by_id = cache
             return self.discovered_agents
 
+        response = await get_http_client().get(f"{POROS_API_URL}/api/registry/agents")
+        self.discovered_agents = response.json()
+
+        # Index the snapshot once per fetch: call_agent looks agents up
+        # by id on every invocation, and the skill-name list per agent
+        # never changes within a snapshot
+        self._agents_by_id = {
+            a["agent_id"]: a for a in self.discovered_agents if a.get("agent_id")
+        }
+        self._skill_names_by_id = {
+            agent_id: [
+                skill.get("name")
+                for skill in agent.get("agent_card", {}).get("skills", [])
+            ]
+            for agent_id, agent in self._agents_by_id.items()
+        }
+
+        IntelligentClient._agents_cache = (
+            now, self.discovered_agents, self._agents_by_id, self._skill_names_by_id
+        )
+        return self.discovered_agents
+
+    async def _refresh_agents_cache(self) -> None:
+        """Re-fetch the registry snapshot if the TTL has lapsed"""
+        cache = IntelligentClient._agents_cache
+        if cache is None or time.monotonic() - cache[0] >= self._AGENTS_CACHE_TTL:
+            IntelligentClient._agents_cache = None
+            await self.discover_agents()
+
     def format_agents_for_llm(self, agents: List[Dict]) -> str:
-        """Format agent cards in a way Gemini can understand"""
+        """
+        Format agent cards in a way Gemini can understand.
+
+        The block is rebuilt only when the registry snapshot changes;
+        every chat turn in between reuses the cached string.
+        """
         if not agents:
             return "No agents currently available in the marketplace."
 
-        formatted = "Available agents in the Poros Protocol marketplace:\n\n"
+        cache = IntelligentClient._llm_block_cache
+        if cache is not None and cache[0] is agents:
+            return cache[1]
+
+        # Collect parts and join once (no quadratic += concatenation)
+        parts = ["Available agents in the Poros Protocol marketplace:\n\n"]
         for agent in agents:
             card = agent.get("agent_card", {})
-            formatted += f"Agent: {card.get('name')}\n"
-            formatted += f"ID: {agent.get('agent_id')}\n"
-            formatted += f"Description: {card.get('description')}\n"
-            formatted += f"URL: {card.get('url')}\n"
+            parts.append(f"Agent: {card.get('name')}\n")
+            parts.append(f"ID: {agent.get('agent_id')}\n")
+            parts.append(f"Description: {card.get('description')}\n")
+            parts.append(f"URL: {card.get('url')}\n")
 
             skills = card.get('skills', [])
             if skills:
-                formatted += "Skills:\n"
+                parts.append("Skills:\n")
                 for skill in skills:
-                    formatted += f"  - {skill.get('name')}: {skill.get('description')}\n"
-                    formatted += f"    Input: {skill.get('input_schema')}\n"
-                    formatted += f"    Output: {skill.get('output_schema')}\n"
+                    parts.append(f"  - {skill.get('name')}: {skill.get('description')}\n")
+                    parts.append(f"    Input: {skill.get('input_schema')}\n")
+                    parts.append(f"    Output: {skill.get('output_schema')}\n")
 
             pricing = card.get('pricing', {})
             if pricing:
-                formatted += f"Pricing: ${pricing.get('amount')} per {pricing.get('model')}\n"
+                parts.append(f"Pricing: ${pricing.get('amount')} per {pricing.get('model')}\n")
 
-            formatted += "\n---\n\n"
+            parts.append("\n---\n\n")
 
+        formatted = "".join(parts)
+        IntelligentClient._llm_block_cache = (agents, formatted)
         return formatted
 
     async def understand_request(self, user_message: str) -> Dict:
@@ -86,7 +195,7 @@ class IntelligentClient:
         # Build conversation context
         history_text = "\n".join([
             f"{msg['role']}: {msg['content']}"
-            for msg in self.conversation_history[-5:]  # Last 5 messages for context
+            for msg in list(self.conversation_history)[-5:]  # Last 5 messages for context
         ])
 
         # Gemini prompt
@@ -119,15 +228,16 @@ Respond in JSON format:
 """
 
         # Call Gemini REST API directly
-        async with httpx.AsyncClient() as http_client:
-            resp = await http_client.post(
-                f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-                json={
-                    "contents": [{"parts": [{"text": prompt}]}]
-                },
-                timeout=30.0
-            )
-            gemini_response = resp.json()
+        resp = await get_http_client().post(
+            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+            json={
+                "contents": [{"parts": [{"text": prompt}]}],
+                # Native JSON mode - no markdown fences to strip
+                "generationConfig": {"responseMimeType": "application/json"}
+            },
+            timeout=30.0
+        )
+        gemini_response = resp.json()
 
         # Check for errors
         if "error" in gemini_response:
@@ -152,10 +262,13 @@ Respond in JSON format:
             }
 
         try:
-            # Parse Gemini's JSON response
-            result = json.loads(response_text.strip().replace("```json", "").replace("```", ""))
-            return result
-        except json.JSONDecodeError:
+            # Parse Gemini's JSON response (JSON mode returns it bare;
+            # strip fences only if a model ignores the mime type)
+            try:
+                return orjson.loads(response_text)
+            except orjson.JSONDecodeError:
+                return orjson.loads(response_text.strip().replace("```json", "").replace("```", ""))
+        except orjson.JSONDecodeError:
             # Fallback if Gemini doesn't return valid JSON
             return {
                 "intent": "general_chat",
@@ -166,27 +279,26 @@ Respond in JSON format:
 
     async def call_agent(self, agent_id: str, parameters: Dict) -> Dict:
         """Call the selected agent through Poros orchestrator"""
-        # Extract skill tags from agent
-        agent = next((a for a in self.discovered_agents if a.get("agent_id") == agent_id), None)
+        # O(1) lookup against the snapshot index (built in discover_agents)
+        agent = self._agents_by_id.get(agent_id)
         if not agent:
             return {"error": "Agent not found"}
 
-        skills = agent.get("agent_card", {}).get("skills", [])
-        skill_names = [skill.get("name") for skill in skills]
+        skill_names = self._skill_names_by_id.get(agent_id, [])
 
         # Build query for orchestrator
-        query = json.dumps(parameters)
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{POROS_API_URL}/api/orchestrator/orchestrate",
-                json={
-                    "query": query,
-                    "skill_tags": skill_names,
-                    "max_agents": 1
-                }
-            )
-            return response.json()
+        query = orjson.dumps(parameters).decode()
+
+        response = await get_http_client().post(
+            f"{POROS_API_URL}/api/orchestrator/orchestrate",
+            json={
+                "query": query,
+                "skill_tags": skill_names,
+                "max_agents": 1
+            },
+            timeout=60.0
+        )
+        return response.json()
 
     async def process_message(self, user_message: str) -> str:
         """Main entry point - process a user message and return a response"""
@@ -196,6 +308,15 @@ Respond in JSON format:
             "content": user_message
         })
 
+        # Trivial smalltalk: answer instantly, no LLM round-trip
+        canned = _trivial_response(user_message)
+        if canned is not None:
+            self.conversation_history.append({
+                "role": "assistant",
+                "content": canned
+            })
+            return canned
+
         # Understand the request
         understanding = await self.understand_request(user_message)
 
@@ -215,34 +336,41 @@ Respond in JSON format:
             agent_id = understanding["selected_agent_id"]
             parameters = understanding.get("agent_parameters", {})
 
-            # Call the agent
-            agent_response = await self.call_agent(agent_id, parameters)
+            # Call the agent, refreshing a stale registry snapshot in
+            # parallel so the next turn's discovery RTT hides behind the
+            # (much slower) orchestration call
+            agent_response, _ = await asyncio.gather(
+                self.call_agent(agent_id, parameters),
+                self._refresh_agents_cache(),
+                return_exceptions=True
+            )
+            if isinstance(agent_response, Exception):
+                agent_response = {"error": str(agent_response)}
 
             # Format response for user using Gemini
             format_prompt = f"""The user asked: "{user_message}"
 
 We called agent "{agent_id}" and got this response:
-{json.dumps(agent_response, indent=2)}
+{orjson.dumps(agent_response, option=orjson.OPT_INDENT_2).decode()}
 
 Format this in a friendly, natural way for the user. Be concise and helpful."""
 
             # Call Gemini REST API
-            async with httpx.AsyncClient() as http_client:
-                resp = await http_client.post(
-                    f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-                    json={"contents": [{"parts": [{"text": format_prompt}]}]},
-                    timeout=30.0
-                )
-                gemini_response = resp.json()
+            resp = await get_http_client().post(
+                f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+                json={"contents": [{"parts": [{"text": format_prompt}]}]},
+                timeout=30.0
+            )
+            gemini_response = resp.json()
 
             # Handle errors
             if "error" in gemini_response:
-                response = f"Agent response: {json.dumps(agent_response, indent=2)}"
+                response = f"Agent response: {orjson.dumps(agent_response, option=orjson.OPT_INDENT_2).decode()}"
             else:
                 try:
                     response = gemini_response["candidates"][0]["content"]["parts"][0]["text"]
                 except (KeyError, IndexError):
-                    response = f"Agent response: {json.dumps(agent_response, indent=2)}"
+                    response = f"Agent response: {orjson.dumps(agent_response, option=orjson.OPT_INDENT_2).decode()}"
 
             self.conversation_history.append({
                 "role": "assistant",
@@ -258,6 +386,94 @@ Format this in a friendly, natural way for the user. Be concise and helpful."""
         })
         return response
 
+    async def _stream_gemini(self, prompt: str):
+        """Yield text chunks from Gemini's SSE streaming endpoint"""
+        async with get_http_client().stream(
+            "POST",
+            f"{GEMINI_STREAM_URL}?alt=sse&key={GEMINI_API_KEY}",
+            json={"contents": [{"parts": [{"text": prompt}]}]},
+            timeout=30.0
+        ) as resp:
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                try:
+                    chunk = orjson.loads(line[6:])
+                    yield chunk["candidates"][0]["content"]["parts"][0]["text"]
+                except (orjson.JSONDecodeError, KeyError, IndexError):
+                    continue
+
+    async def stream_message(self, user_message: str):
+        """
+        Streaming variant of process_message: yields partial response
+        text as it arrives, so the UI shows the first token after ~300ms
+        instead of waiting out the full generation.
+        """
+        self.conversation_history.append({
+            "role": "user",
+            "content": user_message
+        })
+
+        canned = _trivial_response(user_message)
+        if canned is not None:
+            self.conversation_history.append({"role": "assistant", "content": canned})
+            yield canned
+            return
+
+        understanding = await self.understand_request(user_message)
+
+        # Clarifications and general chat are already complete strings -
+        # yield them whole
+        if understanding.get("clarification_needed"):
+            response = understanding.get("user_friendly_response",
+                                       understanding.get("clarification_question",
+                                                       "Can you provide more details?"))
+            self.conversation_history.append({"role": "assistant", "content": response})
+            yield response
+            return
+
+        if not (understanding.get("intent") == "call_agent" and understanding.get("selected_agent_id")):
+            response = understanding.get("user_friendly_response", "I'm here to help! What can I do for you?")
+            self.conversation_history.append({"role": "assistant", "content": response})
+            yield response
+            return
+
+        agent_id = understanding["selected_agent_id"]
+        parameters = understanding.get("agent_parameters", {})
+
+        agent_response, _ = await asyncio.gather(
+            self.call_agent(agent_id, parameters),
+            self._refresh_agents_cache(),
+            return_exceptions=True
+        )
+        if isinstance(agent_response, Exception):
+            agent_response = {"error": str(agent_response)}
+
+        format_prompt = f"""The user asked: "{user_message}"
+
+We called agent "{agent_id}" and got this response:
+{orjson.dumps(agent_response, option=orjson.OPT_INDENT_2).decode()}
+
+Format this in a friendly, natural way for the user. Be concise and helpful."""
+
+        # Stream the formatting pass token-by-token; history is appended
+        # once at stream end with the assembled response
+        parts = []
+        try:
+            async for text in self._stream_gemini(format_prompt):
+                parts.append(text)
+                yield text
+        except httpx.HTTPError:
+            if not parts:
+                fallback = f"Agent response: {orjson.dumps(agent_response, option=orjson.OPT_INDENT_2).decode()}"
+                parts.append(fallback)
+                yield fallback
+
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": "".join(parts)
+        })
+
 
 # Example usage
 async def main():
@@ -0,0 +1,158 @@
+"""
+Shared pilot plumbing: approval modes, the Plan container and the Poros
+backend client used by both the LLM pilot and the pattern-based smart
+client. One definition keeps behavior (and import-time class
+construction) in sync across the two CLIs.
+"""
+
+import bisect
+import itertools
+import logging
+import queue
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List
+
+import orjson
+
+from http_pool import get_http_client, close_http_client
+
+
+def _setup_pilot_logger() -> logging.Logger:
+    """
+    Logger for the async hot paths.
+
+    Emitting a record is just a queue put - the stdout write syscall
+    happens on the QueueListener's own thread, so per-task progress
+    output never serializes the event loop around a blocking write.
+    Interactive prompts and one-off banners stay on plain print().
+    """
+    logger = logging.getLogger("poros.pilot")
+    if not logger.handlers:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(logging.Formatter("%(message)s"))
+        QueueListener(log_queue, stream).start()
+        logger.addHandler(QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+log = _setup_pilot_logger()
+
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+@lru_cache(maxsize=128)
+def _discover_body(capability: str) -> bytes:
+    """Pre-serialized discovery body - capability values repeat heavily"""
+    return orjson.dumps({"capability": capability})
+
+
+class ApprovalMode(Enum):
+    """How much human involvement is needed"""
+    AUTO = "auto"  # 90%+ confidence
+    NOTIFY = "notify"  # 70-90%
+    CONFIRM = "confirm"  # 50-70%
+    INTERACTIVE = "interactive"  # <50%
+
+
+# Confidence thresholds -> approval mode, resolved with a single bisect
+# instead of an if/elif chain
+_THRESHOLDS = (50, 70, 90)
+_MODES = (
+    ApprovalMode.INTERACTIVE,
+    ApprovalMode.CONFIRM,
+    ApprovalMode.NOTIFY,
+    ApprovalMode.AUTO,
+)
+
+
+def calculate_approval_mode(confidence: float) -> ApprovalMode:
+    """Map a confidence score to the required approval mode"""
+    return _MODES[bisect.bisect_right(_THRESHOLDS, confidence)]
+
+
+# datetime.now().timestamp() ids collide when concurrent batch requests
+# land in the same tick; a monotonic clock plus a process-wide counter
+# is both cheaper and collision-free
+_ID_COUNTER = itertools.count()
+
+
+def next_plan_id() -> str:
+    """Mint a unique plan id"""
+    return f"plan_{time.monotonic_ns()}_{next(_ID_COUNTER)}"
+
+
+@dataclass(slots=True)
+class Plan:
+    """
+    A multi-step execution plan.
+
+    slots=True drops the per-instance __dict__ - plans carry dozens of
+    tasks and execution_history keeps them for the session lifetime.
+    """
+    id: str
+    user_request: str
+    tasks: List
+    confidence: float
+    approval_mode: ApprovalMode
+    created_at: datetime
+    reasoning: str = ""
+    status: str = "pending"
+    from_cache: bool = False
+
+
+class PorosClient:
+    """Client for Poros Protocol"""
+
+    def __init__(self, backend_url: str = "https://poros-protocol-production.up.railway.app"):
+        self.backend_url = backend_url
+        # Shared pooled client - every PorosClient talks to the same
+        # backend, so all instances ride one HTTP/2 connection pool
+        self.client = get_http_client()
+
+    @staticmethod
+    async def aclose() -> None:
+        """Close the shared pool (process shutdown only)"""
+        await close_http_client()
+
+    async def discover_agents(self, capability: str) -> List[Dict]:
+        """Find agents by capability"""
+        # Body bytes are memoized per capability and parsing goes
+        # through orjson - no per-call dict build or stdlib json
+        try:
+            response = await self.client.post(
+                f"{self.backend_url}/api/orchestrate/discover",
+                content=_discover_body(capability),
+                headers=_JSON_HEADERS
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            return data.get("agents", [])
+        except Exception as e:
+            log.warning(f"❌ Discovery failed: {e}")
+            return []
+
+    async def query_agent(self, agent_did: str, query: Dict) -> Dict:
+        """Query a specific agent"""
+        try:
+            response = await self.client.post(
+                f"{self.backend_url}/api/orchestrate/query",
+                content=orjson.dumps({
+                    "agent_did": agent_did,
+                    "query": query
+                }),
+                headers=_JSON_HEADERS
+            )
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except Exception as e:
+            log.warning(f"❌ Query failed: {e}")
+            return {"error": str(e)}
@@ -0,0 +1,172 @@
+"""
+Persistent plan-template cache for Poros Pilot.
+
+Completed plans are stored in SQLite keyed by the normalized request
+text plus (optionally) a goal embedding, so repeat and near-repeat
+requests skip the Gemini planning round-trip - the slowest and most
+expensive step of process_request. Exact matching works with the
+standard library alone; semantic matching lights up when numpy and
+sentence-transformers are installed. Embeddings live in one in-memory
+float32 matrix so a lookup is a single matrix @ query product.
+"""
+
+import os
+import sqlite3
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import orjson
+
+from llm_planner import Task
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Cosine similarity floor for treating a cached plan as a template hit
+SIMILARITY_THRESHOLD = 0.90
+
+_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+@lru_cache(maxsize=1)
+def _load_model():
+    """Load the embedding model once per process (None if unavailable)"""
+    if SentenceTransformer is None or np is None:
+        return None
+    return SentenceTransformer(_MODEL_NAME)
+
+
+def _normalize(user_request: str) -> str:
+    """Whitespace/case-normalized request text (the exact-match key)"""
+    return " ".join(user_request.lower().split())
+
+
+class PlanCache:
+    """SQLite-backed plan templates with an in-memory embedding matrix"""
+
+    def __init__(self, db_path: Optional[str] = None,
+                 threshold: float = SIMILARITY_THRESHOLD):
+        self.db_path = db_path or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "plan_cache.db"
+        )
+        self.threshold = threshold
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS plan_templates (
+                request_norm TEXT PRIMARY KEY,
+                embedding BLOB,
+                tasks_json BLOB NOT NULL,
+                confidence REAL NOT NULL,
+                reasoning TEXT NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+        # Row keys + unit-norm embeddings, row i of the matrix belongs
+        # to self._keys[i]; cosine scoring is then one matrix @ query
+        self._keys: List[str] = []
+        self._matrix = None
+        self._load_embeddings()
+
+    def _load_embeddings(self) -> None:
+        if np is None:
+            return
+        rows = self._conn.execute(
+            "SELECT request_norm, embedding FROM plan_templates"
+            " WHERE embedding IS NOT NULL"
+        ).fetchall()
+        if rows:
+            self._keys = [key for key, _ in rows]
+            self._matrix = np.vstack([
+                np.frombuffer(blob, dtype=np.float32) for _, blob in rows
+            ])
+
+    def get(self, user_request: str) -> Optional[Dict]:
+        """
+        Return a cached plan dict for the request, or None.
+
+        Exact match on the normalized text first (a single indexed
+        SELECT); on miss, cosine-search the embedding matrix if the
+        optional model is available.
+        """
+        normalized = _normalize(user_request)
+
+        row = self._conn.execute(
+            "SELECT tasks_json, confidence, reasoning FROM plan_templates"
+            " WHERE request_norm = ?",
+            (normalized,),
+        ).fetchone()
+        if row is None:
+            row = self._semantic_lookup(normalized)
+        if row is None:
+            return None
+
+        tasks_json, confidence, reasoning = row
+        return {
+            "tasks": [Task(**task) for task in orjson.loads(tasks_json)],
+            "confidence": confidence,
+            "reasoning": reasoning,
+        }
+
+    def _semantic_lookup(self, normalized: str):
+        model = _load_model()
+        if model is None or self._matrix is None:
+            return None
+
+        query = model.encode(normalized, convert_to_numpy=True).astype(np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+
+        # Stored rows are unit vectors, so the dot product is cosine
+        scores = self._matrix @ (query / norm)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        return self._conn.execute(
+            "SELECT tasks_json, confidence, reasoning FROM plan_templates"
+            " WHERE request_norm = ?",
+            (self._keys[best],),
+        ).fetchone()
+
+    def put(self, user_request: str, tasks: List[Task],
+            confidence: float, reasoning: str) -> None:
+        """Store a successfully executed plan as a reusable template"""
+        normalized = _normalize(user_request)
+
+        embedding_blob = None
+        model = _load_model()
+        if model is not None:
+            embedding = model.encode(normalized, convert_to_numpy=True).astype(np.float32)
+            norm = np.linalg.norm(embedding)
+            if norm > 0:
+                embedding_blob = (embedding / norm).tobytes()
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO plan_templates VALUES (?, ?, ?, ?, ?)",
+            (
+                normalized,
+                embedding_blob,
+                orjson.dumps([asdict(task) for task in tasks]),
+                confidence,
+                reasoning,
+            ),
+        )
+        self._conn.commit()
+
+        if embedding_blob is not None:
+            self._keys.append(normalized)
+            vector = np.frombuffer(embedding_blob, dtype=np.float32)[None, :]
+            self._matrix = (
+                vector if self._matrix is None
+                else np.vstack([self._matrix, vector])
+            )
@@ -10,75 +10,25 @@ Features:
 - Full autonomy when safe
 """
 
-import httpx
-import json
+import asyncio
 import os
-from typing import List, Dict, Any, Optional
-from enum import Enum
-from dataclasses import dataclass
+import re
+from typing import List, Dict
+from collections import deque
 from datetime import datetime
 
 # Import our LLM planner
 from llm_planner import LLMTaskPlanner, Task
+from pilot_common import ApprovalMode, Plan, PorosClient, calculate_approval_mode, log, next_plan_id
+from plan_cache import PlanCache
 
+# Compiled once - a single C-level scan instead of one substring
+# search per keyword
+_WEATHER_PAT = re.compile(r"\b(?:weather|temperature)\b", re.IGNORECASE)
 
-class ApprovalMode(Enum):
-    """How much human involvement is needed"""
-    AUTO = "auto"  # 90%+ confidence
-    NOTIFY = "notify"  # 70-90%
-    CONFIRM = "confirm"  # 50-70%
-    INTERACTIVE = "interactive"  # <50%
-
-
-@dataclass
-class Plan:
-    """A multi-step execution plan"""
-    id: str
-    user_request: str
-    tasks: List[Task]
-    confidence: float
-    approval_mode: ApprovalMode
-    reasoning: str
-    created_at: datetime
-    status: str = "pending"
-
-
-class PorosClient:
-    """Client for Poros Protocol"""
-
-    def __init__(self, backend_url: str = "https://poros-protocol-production.up.railway.app"):
-        self.backend_url = backend_url
-        self.client = httpx.AsyncClient(timeout=30.0)
-
-    async def discover_agents(self, capability: str) -> List[Dict]:
-        """Find agents by capability"""
-        try:
-            response = await self.client.post(
-                f"{self.backend_url}/api/orchestrate/discover",
-                json={"capability": capability}
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("agents", [])
-        except Exception as e:
-            print(f"❌ Discovery failed: {e}")
-            return []
-
-    async def query_agent(self, agent_did: str, query: Dict) -> Dict:
-        """Query a specific agent"""
-        try:
-            response = await self.client.post(
-                f"{self.backend_url}/api/orchestrate/query",
-                json={
-                    "agent_did": agent_did,
-                    "query": query
-                }
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"❌ Query failed: {e}")
-            return {"error": str(e)}
+# Fallback classification only looks at the head of the request;
+# pasted blobs shouldn't cost a full-payload scan
+_FALLBACK_SCAN_LIMIT = 512
 
 
 class PorosPilot:
@@ -96,42 +46,120 @@ class PorosPilot:
             self.planner = None
 
         self.poros = PorosClient()
-        self.execution_history = []
+        # Ring buffer - unbounded history is a slow memory leak in a
+        # long-running CLI (pilot tasks hold no result payloads, so
+        # bounding the count is enough here)
+        self.execution_history = deque(maxlen=256)
+
+        # Completed plans become reusable templates - a repeat (or
+        # near-repeat) request skips the Gemini planning call entirely
+        try:
+            self.plan_cache = PlanCache()
+        except Exception as e:
+            print(f"⚠️  Plan cache disabled ({e})")
+            self.plan_cache = None
+
+        # capability -> in-flight/completed discovery future. N parallel
+        # weather-ish tasks issue 1 discover + N queries instead of N of
+        # each; the lock only guards the dict, not the network call.
+        self._agent_cache: Dict[str, asyncio.Future] = {}
+        self._agent_cache_lock = asyncio.Lock()
+
+    async def _resolve_agent(self, capability: str) -> List[Dict]:
+        """
+        Discover agents for a capability once per pilot; concurrent
+        callers await the same future instead of racing duplicate
+        discovery round-trips.
+        """
+        async with self._agent_cache_lock:
+            future = self._agent_cache.get(capability)
+            if future is None:
+                future = asyncio.ensure_future(self.poros.discover_agents(capability))
+                self._agent_cache[capability] = future
+
+        agents = await future
+        if not agents:
+            # Don't pin a miss - let the next task retry discovery
+            self._agent_cache.pop(capability, None)
+        return agents
+
+    async def process_requests(self, user_requests: List[str],
+                               max_concurrency: int = 8) -> List[Dict]:
+        """
+        Run several independent requests concurrently.
+
+        Bounded by a semaphore so a large batch can't stampede the
+        backend; discovery calls share the pooled client and repeat
+        plans hit the planner/template caches. Failures are isolated
+        per request.
+
+        Requests no cache will serve are batch-planned up front:
+        create_plans packs them into one Gemini prompt and fills the
+        planner's plan cache, so the per-request path below finds its
+        plan cached instead of paying one model round-trip each.
+        """
+        if self.llm_enabled and len(user_requests) > 1:
+            novel = [
+                r for r in dict.fromkeys(user_requests)
+                if self.plan_cache is None or self.plan_cache.get(r) is None
+            ]
+            if len(novel) > 1:
+                try:
+                    await self.planner.create_plans(novel)
+                except Exception as e:
+                    log.warning(f"⚠️  Batch planning failed, planning per request: {e}")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(user_request: str) -> Dict:
+            async with semaphore:
+                try:
+                    return await self.process_request(user_request)
+                except Exception as e:
+                    return {"status": "error", "error": str(e)}
+
+        return list(await asyncio.gather(*(run(r) for r in user_requests)))
 
     async def process_request(self, user_request: str) -> Dict:
         """Main entry point"""
-        print(f"\n{'='*60}")
-        print(f"📨 Request: {user_request}")
-        print(f"{'='*60}\n")
+        log.info(f"\n{'='*60}\n📨 Request: {user_request}\n{'='*60}\n")
 
-        # Step 1: Create plan using LLM
+        # Step 1: Create plan - cached template first, then LLM
         if self.llm_enabled:
-            plan_data = self.planner.create_plan(user_request)
+            plan_data = self.plan_cache.get(user_request) if self.plan_cache else None
+            from_cache = plan_data is not None
+            if from_cache:
+                log.info("⚡ Reusing cached plan template (no LLM call)")
+            else:
+                plan_data = await self._stream_plan(user_request)
             plan = Plan(
-                id=f"plan_{datetime.now().timestamp()}",
+                id=next_plan_id(),
                 user_request=user_request,
                 tasks=plan_data["tasks"],
                 confidence=plan_data["confidence"],
-                approval_mode=self._calculate_approval_mode(plan_data["confidence"]),
+                approval_mode=calculate_approval_mode(plan_data["confidence"]),
                 reasoning=plan_data["reasoning"],
-                created_at=datetime.now()
+                created_at=datetime.now(),
+                from_cache=from_cache
             )
         else:
             # Fallback to simple patterns
             plan = self._fallback_plan(user_request)
 
         # Show plan details
-        print(f"🧠 AI Reasoning: {plan.reasoning}")
-        print(f"🎯 Confidence: {plan.confidence}%")
-        print(f"🚦 Approval Mode: {plan.approval_mode.value}\n")
+        log.info(
+            f"🧠 AI Reasoning: {plan.reasoning}\n"
+            f"🎯 Confidence: {plan.confidence}%\n"
+            f"🚦 Approval Mode: {plan.approval_mode.value}\n"
+        )
 
         # Step 2: Handle based on approval mode
         if plan.approval_mode == ApprovalMode.AUTO:
-            print("✅ High confidence - executing automatically...\n")
+            log.info("✅ High confidence - executing automatically...\n")
             return await self._execute_plan(plan)
 
         elif plan.approval_mode == ApprovalMode.NOTIFY:
-            print("📢 Executing with notification...\n")
+            log.info("📢 Executing with notification...\n")
             result = await self._execute_plan(plan)
             self._notify_user(plan, result)
             return result
@@ -139,7 +167,7 @@ class PorosPilot:
         elif plan.approval_mode == ApprovalMode.CONFIRM:
             print("⏸️  Requesting your approval...\n")
             self._show_plan(plan)
-            if self._request_approval():
+            if await self._request_approval():
                 return await self._execute_plan(plan)
             else:
                 return {"status": "cancelled", "message": "User declined"}
@@ -148,23 +176,45 @@ class PorosPilot:
             print("❓ Need more information...\n")
             return self._interactive_mode(plan)
 
-    def _calculate_approval_mode(self, confidence: float) -> ApprovalMode:
-        """Determine approval mode from confidence"""
-        if confidence >= 90:
-            return ApprovalMode.AUTO
-        elif confidence >= 70:
-            return ApprovalMode.NOTIFY
-        elif confidence >= 50:
-            return ApprovalMode.CONFIRM
-        else:
-            return ApprovalMode.INTERACTIVE
+    async def _stream_plan(self, user_request: str) -> Dict:
+        """
+        Plan via the streaming API, overlapping planning with I/O.
+
+        As each task arrives we kick off (side-effect-free) agent
+        discovery for its capability, so by the time the confidence
+        gate resolves, _execute_task usually finds the agents already
+        cached. Execution itself still waits for the approval gate -
+        only read-only discovery is prefetched. Falls back to the
+        non-streaming planner if the stream yields no tasks.
+        """
+        tasks = []
+        confidence = 50.0
+        reasoning = ""
+        try:
+            async for item in self.planner.create_plan_stream(user_request):
+                if isinstance(item, Task):
+                    tasks.append(item)
+                    if item.agent_capability:
+                        asyncio.ensure_future(
+                            self._resolve_agent(item.agent_capability)
+                        )
+                else:
+                    confidence = item.get("confidence", 50.0)
+                    reasoning = item.get("reasoning", "")
+        except Exception as e:
+            log.warning(f"⚠️  Streamed planning failed: {e}")
+
+        if not tasks:
+            return await self.planner.create_plan(user_request)
+        return {"tasks": tasks, "confidence": confidence, "reasoning": reasoning}
 
     def _fallback_plan(self, user_request: str) -> Plan:
         """Simple fallback if LLM unavailable"""
-        # Weather check
-        if any(w in user_request.lower() for w in ["weather", "temperature"]):
+        # Weather check - one regex pass over at most the first 512
+        # chars (the full request still lands in Plan.user_request)
+        if _WEATHER_PAT.search(user_request[:_FALLBACK_SCAN_LIMIT]):
             return Plan(
-                id=f"plan_{datetime.now().timestamp()}",
+                id=next_plan_id(),
                 user_request=user_request,
                 tasks=[Task(
                     id="weather_1",
@@ -180,7 +230,7 @@ class PorosPilot:
 
         # Default: unclear
         return Plan(
-            id=f"plan_{datetime.now().timestamp()}",
+            id=next_plan_id(),
             user_request=user_request,
             tasks=[Task(
                 id="clarify_1",
@@ -208,10 +258,19 @@ class PorosPilot:
                 print(f"     Why: {task.reasoning}")
         print("-" * 60)
 
-    def _request_approval(self) -> bool:
-        """Ask for approval"""
+    async def _request_approval(self) -> bool:
+        """
+        Ask for approval.
+
+        input() runs in the default executor so the event loop keeps
+        servicing keepalives and concurrent batch requests while the
+        user decides.
+        """
+        loop = asyncio.get_running_loop()
         while True:
-            response = input("\n✅ Approve? [Y/n]: ").strip().lower()
+            response = (await loop.run_in_executor(
+                None, input, "\n✅ Approve? [Y/n]: "
+            )).strip().lower()
             if response in ['y', 'yes', '']:
                 return True
             elif response in ['n', 'no']:
@@ -219,36 +278,81 @@ class PorosPilot:
             print("Please enter Y or N")
 
     async def _execute_plan(self, plan: Plan) -> Dict:
-        """Execute the plan"""
-        print("🚀 Executing...\n")
+        """
+        Execute the plan, level by level.
+
+        Tasks whose depends_on are all satisfied run concurrently via
+        asyncio.gather, so independent branches (flights ∥ hotel ∥
+        research) cost max(latency) instead of the sum. Failures are
+        isolated per task instead of aborting the whole plan.
+        """
+        log.info("🚀 Executing...\n")
         results = []
+        results_by_id: Dict[str, Dict] = {}
+        done_ids = set()
+        pending = list(plan.tasks)
+        step = 0
+        total = len(plan.tasks)
+
+        while pending:
+            level = [t for t in pending if all(d in done_ids for d in t.depends_on)]
+            if not level:
+                # Unsatisfiable depends_on (cycle or typo) - run the
+                # rest serially rather than deadlock
+                level = pending
+            pending = [t for t in pending if t not in level]
+
+            level_results = await asyncio.gather(
+                *(self._execute_task(t) for t in level),
+                return_exceptions=True
+            )
 
-        for i, task in enumerate(plan.tasks, 1):
-            print(f"[{i}/{len(plan.tasks)}] {task.action}...")
-            result = await self._execute_task(task)
-            results.append(result)
-
-            if "error" in result:
-                print(f"   ❌ Failed: {result['error']}\n")
-                task.status = "failed"
-                break
-            else:
-                print(f"   ✓ Done\n")
-                task.status = "completed"
+            # Log after the gather so output order stays deterministic
+            for task, result in zip(level, level_results):
+                step += 1
+                if isinstance(result, Exception):
+                    result = {"error": str(result)}
+                log.info(f"[{step}/{total}] {task.action}...")
+                if "error" in result:
+                    log.info(f"   ❌ Failed: {result['error']}\n")
+                    task.status = "failed"
+                else:
+                    log.info("   ✓ Done\n")
+                    task.status = "completed"
+                results.append(result)
+                results_by_id[task.id] = result
+                done_ids.add(task.id)
 
         plan.status = "completed"
         self.execution_history.append(plan)
 
+        # A fully successful LLM plan becomes a template for next time;
+        # planner fallbacks (marked in reasoning) should retry the model
+        if (
+            self.plan_cache is not None
+            and self.llm_enabled
+            and not plan.from_cache
+            and "(fallback)" not in plan.reasoning
+            and all(task.status == "completed" for task in plan.tasks)
+        ):
+            try:
+                self.plan_cache.put(
+                    plan.user_request, plan.tasks, plan.confidence, plan.reasoning
+                )
+            except Exception as e:
+                log.warning(f"⚠️  Plan cache write failed ({e})")
+
         return {
             "status": "success",
-            "results": results
+            "results": results,
+            "results_by_task": results_by_id
         }
 
     async def _execute_task(self, task: Task) -> Dict:
         """Execute a single task"""
         # Weather
         if task.action == "get_weather" or task.agent_capability == "weather_forecast":
-            agents = await self.poros.discover_agents("weather_forecast")
+            agents = await self._resolve_agent("weather_forecast")
             if not agents:
                 return {"error": "No weather agent found"}
 
@@ -280,7 +384,7 @@ class PorosPilot:
 
         # Discovery
         elif task.action == "find_agent" and task.agent_capability:
-            agents = await self.poros.discover_agents(task.agent_capability)
+            agents = await self._resolve_agent(task.agent_capability)
             return {"found": len(agents), "agents": [a["name"] for a in agents]}
 
         # Clarification
@@ -291,6 +395,24 @@ class PorosPilot:
         else:
             return {"status": "simulated", "action": task.action}
 
+    def get_history(self, include_results: bool = False) -> List[Dict]:
+        """Recent plan summaries, oldest first (max 256 retained)"""
+        history = []
+        for plan in self.execution_history:
+            entry = {
+                "id": plan.id,
+                "user_request": plan.user_request,
+                "confidence": plan.confidence,
+                "status": plan.status,
+            }
+            if include_results:
+                entry["tasks"] = [
+                    {"id": task.id, "action": task.action, "status": task.status}
+                    for task in plan.tasks
+                ]
+            history.append(entry)
+        return history
+
     def _notify_user(self, plan: Plan, result: Dict):
         """Post-execution notification"""
         print("\n" + "="*60)
@@ -338,37 +460,39 @@ async def main():
     print("   'Plan a trip to Seattle'")
     print("   'quit' to exit\n")
 
-    while True:
-        try:
-            user_input = input("You: ").strip()
+    try:
+        while True:
+            try:
+                user_input = input("You: ").strip()
 
-            if not user_input:
-                continue
+                if not user_input:
+                    continue
 
-            if user_input.lower() in ['quit', 'exit', 'bye']:
-                print("\n👋 Goodbye!")
-                break
+                if user_input.lower() in ['quit', 'exit', 'bye']:
+                    print("\n👋 Goodbye!")
+                    break
 
-            result = await pilot.process_request(user_input)
+                result = await pilot.process_request(user_input)
 
-            if result.get("status") == "success":
-                print("\n✅ Completed!\n")
-                # Show results
-                for r in result.get("results", []):
-                    if "city" in r:
-                        print(f"   {r['city']}: {r['temperature']}°F, {r['condition']}")
-                    elif "slots" in r:
-                        print(f"   Available: {', '.join(r['slots'])}")
+                if result.get("status") == "success":
+                    print("\n✅ Completed!\n")
+                    # Show results
+                    for r in result.get("results", []):
+                        if "city" in r:
+                            print(f"   {r['city']}: {r['temperature']}°F, {r['condition']}")
+                        elif "slots" in r:
+                            print(f"   Available: {', '.join(r['slots'])}")
 
-            print("\n" + "-"*60 + "\n")
+                print("\n" + "-"*60 + "\n")
 
-        except KeyboardInterrupt:
-            print("\n\n👋 Goodbye!")
-            break
-        except Exception as e:
-            print(f"\n❌ Error: {e}\n")
+            except KeyboardInterrupt:
+                print("\n\n👋 Goodbye!")
+                break
+            except Exception as e:
+                print(f"\n❌ Error: {e}\n")
+    finally:
+        await PorosClient.aclose()
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
@@ -10,23 +10,23 @@ Features:
 - Works with Poros Protocol agents
 """
 
-import httpx
+import asyncio
 import json
 from typing import List, Dict, Any, Optional
-from enum import Enum
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 
+from pilot_common import ApprovalMode, Plan, PorosClient, calculate_approval_mode, log, next_plan_id
 
-class ApprovalMode(Enum):
-    """How much human involvement is needed"""
-    AUTO = "auto"  # 90%+ confidence - just do it
-    NOTIFY = "notify"  # 70-90% - do it, then tell me
-    CONFIRM = "confirm"  # 50-70% - show plan, wait for approval
-    INTERACTIVE = "interactive"  # <50% - I need to help
+try:
+    import ahocorasick  # pyahocorasick - C-extension multi-keyword matcher
+except ImportError:
+    ahocorasick = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """A single task step"""
     id: str
@@ -45,18 +45,6 @@ class Task:
             self.depends_on = []
 
 
-@dataclass
-class Plan:
-    """A multi-step execution plan"""
-    id: str
-    user_request: str
-    tasks: List[Task]
-    confidence: float
-    approval_mode: ApprovalMode
-    created_at: datetime
-    status: str = "pending"
-
-
 class TaskPlanner:
     """Breaks down high-level requests into executable steps"""
 
@@ -100,25 +88,57 @@ class TaskPlanner:
             }
         }
 
-    def create_plan(self, user_request: str) -> Plan:
-        """Create an execution plan from user request"""
-        # Simple pattern matching
-        request_lower = user_request.lower()
+        # One automaton pass matches every keyword at once instead of
+        # |patterns| x |keywords| substring scans per request
+        self._ac = None
+        if ahocorasick is not None:
+            self._ac = ahocorasick.Automaton()
+            for pattern_name, pattern_data in self.patterns.items():
+                for keyword in pattern_data["keywords"]:
+                    self._ac.add_word(keyword, pattern_name)
+            self._ac.make_automaton()
+
+    @lru_cache(maxsize=1024)
+    def _match_pattern(self, request_lower: str) -> Optional[str]:
+        """
+        Name of the first matching pattern, or None.
+
+        Memoized - repeated CLI queries skip the scan entirely. The
+        automaton finds all keyword hits in one pass; declaration order
+        of self.patterns still decides precedence.
+        """
+        if self._ac is not None:
+            matched = {pattern_name for _, pattern_name in self._ac.iter(request_lower)}
+            for pattern_name in self.patterns:
+                if pattern_name in matched:
+                    return pattern_name
+            return None
 
         for pattern_name, pattern_data in self.patterns.items():
             if any(keyword in request_lower for keyword in pattern_data["keywords"]):
-                return Plan(
-                    id=f"plan_{datetime.now().timestamp()}",
-                    user_request=user_request,
-                    tasks=pattern_data["tasks"],
-                    confidence=pattern_data["confidence"],
-                    approval_mode=self._calculate_approval_mode(pattern_data["confidence"]),
-                    created_at=datetime.now()
-                )
+                return pattern_name
+        return None
+
+    def create_plan(self, user_request: str) -> Plan:
+        """Create an execution plan from user request"""
+        # Classification only looks at the head of the request - a
+        # pasted blob shouldn't cost a full scan or bloat the memo
+        # cache keys (the full request still lands in the Plan)
+        pattern_name = self._match_pattern(user_request[:512].lower())
+        if pattern_name is not None:
+            pattern_data = self.patterns[pattern_name]
+            return Plan(
+                id=next_plan_id(),
+                user_request=user_request,
+                tasks=pattern_data["tasks"],
+                confidence=pattern_data["confidence"],
+                approval_mode=calculate_approval_mode(pattern_data["confidence"]),
+                created_at=datetime.now()
+            )
 
         # Unknown task
         return Plan(
-            id=f"plan_{datetime.now().timestamp()}",
+            id=next_plan_id(),
             user_request=user_request,
             tasks=[Task(id="unknown", action="clarify",
                        parameters={"question": "What would you like me to do?"})],
@@ -127,55 +147,6 @@ class TaskPlanner:
             created_at=datetime.now()
         )
 
-    def _calculate_approval_mode(self, confidence: float) -> ApprovalMode:
-        """Determine how much human involvement needed"""
-        if confidence >= 90:
-            return ApprovalMode.AUTO
-        elif confidence >= 70:
-            return ApprovalMode.NOTIFY
-        elif confidence >= 50:
-            return ApprovalMode.CONFIRM
-        else:
-            return ApprovalMode.INTERACTIVE
-
-
-class PorosClient:
-    """Client for Poros Protocol"""
-
-    def __init__(self, backend_url: str = "https://poros-protocol-production.up.railway.app"):
-        self.backend_url = backend_url
-        self.client = httpx.AsyncClient(timeout=30.0)
-
-    async def discover_agents(self, capability: str) -> List[Dict]:
-        """Find agents by capability"""
-        try:
-            response = await self.client.post(
-                f"{self.backend_url}/api/orchestrate/discover",
-                json={"capability": capability}
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("agents", [])
-        except Exception as e:
-            print(f"❌ Discovery failed: {e}")
-            return []
-
-    async def query_agent(self, agent_did: str, query: Dict) -> Dict:
-        """Query a specific agent"""
-        try:
-            response = await self.client.post(
-                f"{self.backend_url}/api/orchestrate/query",
-                json={
-                    "agent_did": agent_did,
-                    "query": query
-                }
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"❌ Query failed: {e}")
-            return {"error": str(e)}
-
 
 class SmartClientAgent:
     """The Smart Client Agent - Your Personal AI Assistant"""
@@ -183,27 +154,53 @@ class SmartClientAgent:
     def __init__(self):
         self.planner = TaskPlanner()
         self.poros = PorosClient()
-        self.execution_history = []
+        # Ring buffer - a long-running CLI would otherwise grow RSS
+        # forever; results are compacted before retention
+        self.execution_history = deque(maxlen=256)
+
+        # capability -> in-flight/completed discovery future, so
+        # parallel tasks needing the same capability share one
+        # discovery round-trip
+        self._agent_cache: Dict[str, asyncio.Future] = {}
+        self._agent_cache_lock = asyncio.Lock()
+
+    async def _resolve_agent(self, capability: str) -> List[Dict]:
+        """
+        Discover agents for a capability once per session; concurrent
+        callers await the same future instead of racing duplicate
+        discovery round-trips.
+        """
+        async with self._agent_cache_lock:
+            future = self._agent_cache.get(capability)
+            if future is None:
+                future = asyncio.ensure_future(self.poros.discover_agents(capability))
+                self._agent_cache[capability] = future
+
+        agents = await future
+        if not agents:
+            # Don't pin a miss - let the next task retry discovery
+            self._agent_cache.pop(capability, None)
+        return agents
 
     async def process_request(self, user_request: str) -> Dict:
         """Main entry point - process a user request"""
-        print(f"\n{'='*60}")
-        print(f"📨 User Request: {user_request}")
-        print(f"{'='*60}\n")
+        log.info(f"\n{'='*60}\n📨 User Request: {user_request}\n{'='*60}\n")
 
         # Step 1: Create plan
         plan = self.planner.create_plan(user_request)
-        print(f"📋 Plan created: {len(plan.tasks)} tasks")
-        print(f"🎯 Confidence: {plan.confidence}%")
-        print(f"🚦 Approval Mode: {plan.approval_mode.value}\n")
+        log.info(
+            f"📋 Plan created: {len(plan.tasks)} tasks\n"
+            f"🎯 Confidence: {plan.confidence}%\n"
+            f"🚦 Approval Mode: {plan.approval_mode.value}\n"
+        )
 
         # Step 2: Handle based on approval mode
         if plan.approval_mode == ApprovalMode.AUTO:
-            print("✅ High confidence - executing automatically...\n")
+            log.info("✅ High confidence - executing automatically...\n")
             return await self._execute_plan(plan)
 
         elif plan.approval_mode == ApprovalMode.NOTIFY:
-            print("📢 Will execute and notify you...\n")
+            log.info("📢 Will execute and notify you...\n")
             result = await self._execute_plan(plan)
             self._notify_user(plan, result)
             return result
@@ -211,7 +208,7 @@ class SmartClientAgent:
         elif plan.approval_mode == ApprovalMode.CONFIRM:
             print("⏸️  Waiting for your approval...\n")
             self._show_plan(plan)
-            if self._request_approval():
+            if await self._request_approval():
                 return await self._execute_plan(plan)
             else:
                 return {"status": "cancelled", "message": "User cancelled"}
@@ -231,10 +228,18 @@ class SmartClientAgent:
                 print(f"     Parameters: {task.parameters}")
         print("-" * 60)
 
-    def _request_approval(self) -> bool:
-        """Ask user for approval"""
+    async def _request_approval(self) -> bool:
+        """
+        Ask user for approval.
+
+        input() runs in the default executor so the event loop keeps
+        servicing keepalives and concurrent work while the user decides.
+        """
+        loop = asyncio.get_running_loop()
         while True:
-            response = input("\n✅ Approve and execute? [Y/n]: ").strip().lower()
+            response = (await loop.run_in_executor(
+                None, input, "\n✅ Approve and execute? [Y/n]: "
+            )).strip().lower()
             if response in ['y', 'yes', '']:
                 return True
             elif response in ['n', 'no']:
@@ -243,20 +248,45 @@ class SmartClientAgent:
                 print("Please enter Y or N")
 
     async def _execute_plan(self, plan: Plan) -> Dict:
-        """Execute all tasks in the plan"""
-        print("🚀 Executing plan...\n")
+        """
+        Execute all tasks in the plan, level by level.
+
+        Tasks whose depends_on are all satisfied run concurrently via
+        asyncio.gather - independent branches cost max(latency) instead
+        of the sum - and a failure in one task no longer aborts its
+        siblings.
+        """
+        log.info("🚀 Executing plan...\n")
         results = []
+        done_ids = set()
+        pending = list(plan.tasks)
+
+        while pending:
+            level = [t for t in pending if all(d in done_ids for d in t.depends_on)]
+            if not level:
+                # Unsatisfiable depends_on (cycle or typo) - run the
+                # rest serially rather than deadlock
+                level = pending
+            pending = [t for t in pending if t not in level]
+
+            level_results = await asyncio.gather(
+                *(self._execute_task(t, plan) for t in level),
+                return_exceptions=True
+            )
 
-        for task in plan.tasks:
-            print(f"▶️  Executing: {task.action}")
-            result = await self._execute_task(task, plan)
-            task.result = result
-            task.status = "completed" if "error" not in result else "failed"
-            results.append(result)
-            print(f"   ✓ Done\n")
+            # Log after the gather so output order stays deterministic
+            for task, result in zip(level, level_results):
+                if isinstance(result, Exception):
+                    result = {"error": str(result)}
+                log.info(f"▶️  Executing: {task.action}")
+                task.result = result
+                task.status = "completed" if "error" not in result else "failed"
+                results.append(result)
+                done_ids.add(task.id)
+                log.info("   ✓ Done\n")
 
         plan.status = "completed"
-        self.execution_history.append(plan)
+        self.execution_history.append(self._compact(plan))
 
         return {
             "status": "success",
@@ -264,12 +294,45 @@ class SmartClientAgent:
             "results": results
         }
 
+    @staticmethod
+    def _compact(plan: Plan) -> Plan:
+        """
+        Strip bulky result bodies before a plan enters the history.
+
+        The caller already received the full results; retaining weather
+        JSON / agent payloads per task for the process lifetime is pure
+        memory overhead, so only status and original size are kept.
+        """
+        for task in plan.tasks:
+            if task.result is not None:
+                try:
+                    size = len(json.dumps(task.result, default=str))
+                except (TypeError, ValueError):
+                    size = -1
+                task.result = {"status": task.status, "size": size}
+        return plan
+
+    def get_history(self, include_results: bool = False) -> List[Dict]:
+        """Recent plan summaries, oldest first (max 256 retained)"""
+        history = []
+        for plan in self.execution_history:
+            entry = {
+                "id": plan.id,
+                "user_request": plan.user_request,
+                "confidence": plan.confidence,
+                "status": plan.status,
+            }
+            if include_results:
+                entry["results"] = [task.result for task in plan.tasks]
+            history.append(entry)
+        return history
+
     async def _execute_task(self, task: Task, plan: Plan) -> Dict:
         """Execute a single task"""
         # Handle different task types
         if task.action == "get_weather":
-            # Discover weather agent
-            agents = await self.poros.discover_agents("weather_forecast")
+            # Discover weather agent (cached per capability)
+            agents = await self._resolve_agent("weather_forecast")
             if not agents:
                 return {"error": "No weather agent found"}
 
@@ -295,7 +358,7 @@ class SmartClientAgent:
             }
 
         elif task.action == "find_agent":
-            agents = await self.poros.discover_agents(task.agent_capability)
+            agents = await self._resolve_agent(task.agent_capability)
             return {"agents_found": len(agents), "agents": agents}
 
         elif task.action == "clarify":
@@ -347,35 +410,37 @@ async def main():
     print("   - 'Plan a trip to Seattle'")
     print("   - 'quit' to exit\n")
 
-    while True:
-        try:
-            user_input = input("You: ").strip()
+    try:
+        while True:
+            try:
+                user_input = input("You: ").strip()
 
-            if not user_input:
-                continue
+                if not user_input:
+                    continue
 
-            if user_input.lower() in ['quit', 'exit', 'bye']:
-                print("\n👋 Goodbye!")
-                break
+                if user_input.lower() in ['quit', 'exit', 'bye']:
+                    print("\n👋 Goodbye!")
+                    break
 
-            result = await agent.process_request(user_input)
+                result = await agent.process_request(user_input)
 
-            if result.get("status") == "success":
-                print("\n✅ Task completed successfully!")
-            elif result.get("status") == "cancelled":
-                print("\n❌ Task cancelled")
-            else:
-                print(f"\n⚠️  Result: {json.dumps(result, indent=2)}")
+                if result.get("status") == "success":
+                    print("\n✅ Task completed successfully!")
+                elif result.get("status") == "cancelled":
+                    print("\n❌ Task cancelled")
+                else:
+                    print(f"\n⚠️  Result: {json.dumps(result, indent=2)}")
 
-            print("\n" + "-"*60 + "\n")
+                print("\n" + "-"*60 + "\n")
 
-        except KeyboardInterrupt:
-            print("\n\n👋 Goodbye!")
-            break
-        except Exception as e:
-            print(f"\n❌ Error: {e}\n")
+            except KeyboardInterrupt:
+                print("\n\n👋 Goodbye!")
+                break
+            except Exception as e:
+                print(f"\n❌ Error: {e}\n")
+    finally:
+        await PorosClient.aclose()
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
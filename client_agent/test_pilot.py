@@ -34,20 +34,15 @@ async def test_dentist_booking():
         "Book me a dentist appointment for next Tuesday"
     ]
 
-    for request in test_cases:
+    # Run the whole batch concurrently - discovery calls share the
+    # pooled client and Gemini planning is batched/cached
+    results = await pilot.process_requests(test_cases)
+
+    for request, result in zip(test_cases, results):
         print(f"\n{'='*60}")
         print(f"TEST: {request}")
         print('='*60)
-
-        try:
-            result = await pilot.process_request(request)
-            print(f"\nFinal Result: {result}")
-        except Exception as e:
-            print(f"\n❌ Error: {e}")
-            import traceback
-            traceback.print_exc()
-
-        input("\n\nPress Enter to continue to next test...")
+        print(f"\nFinal Result: {result}")
 
 
 if __name__ == "__main__":
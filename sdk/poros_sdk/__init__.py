@@ -4,8 +4,22 @@ Poros SDK - Build AI agents for the Poros Protocol
 Simple Python SDK for registering and running agents on the Poros network.
 """
 
-from .client import PorosClient
-from .identity import generate_did, sign_agent_card
+from .client import AsyncPorosClient, PorosClient
+from .identity import (
+    generate_did,
+    generate_did_raw,
+    sign_agent_card,
+    sign_agent_card_bytes,
+    sign_agent_card_raw,
+)
 
 __version__ = "0.1.0"
-__all__ = ["PorosClient", "generate_did", "sign_agent_card"]
+__all__ = [
+    "AsyncPorosClient",
+    "PorosClient",
+    "generate_did",
+    "generate_did_raw",
+    "sign_agent_card",
+    "sign_agent_card_bytes",
+    "sign_agent_card_raw",
+]
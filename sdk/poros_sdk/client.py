@@ -2,9 +2,42 @@
 Poros Client - Communicate with the Poros Protocol backend
 """
 
+import asyncio
+import random
+import time
+
 import httpx
 from typing import Dict, Any, Optional, List
 
+# Capability -> agent mappings change on the order of minutes, so
+# discovery results are cached per-client for a short TTL
+_DISCOVER_TTL = 60.0
+_DISCOVER_CACHE_MAX = 256
+
+# Transient-failure retry policy: the transport retries connection
+# failures, and _post_with_retry re-sends on gateway errors with
+# jittered exponential backoff so flapping backends aren't stormed
+_RETRY_STATUS = frozenset({502, 503, 504})
+_MAX_ATTEMPTS = 3
+_BASE_DELAY = 0.05
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Jittered exponential delay before retry number `attempt`."""
+    return _BASE_DELAY * (2 ** (attempt - 1)) * (1 + random.random())
+
+
+def _discover_ttl_for(response: httpx.Response, default: float) -> float:
+    """TTL for a discovery response - honors Cache-Control: max-age."""
+    for part in response.headers.get("cache-control", "").split(","):
+        part = part.strip()
+        if part.startswith("max-age="):
+            try:
+                return float(part[len("max-age="):])
+            except ValueError:
+                break
+    return default
+
 
 class PorosClient:
     """Client for interacting with the Poros Protocol backend."""
@@ -27,6 +60,56 @@ class PorosClient:
         self.username = username
         self.password = password
         self._token: Optional[str] = None
+        # One persistent connection pool for the whole session - every
+        # call hits the same backend host, so keep-alive amortizes the
+        # TCP+TLS handshake across calls instead of paying it per POST
+        self._http = httpx.Client(
+            base_url=self.backend_url,
+            timeout=10.0,
+            transport=httpx.HTTPTransport(
+                retries=2,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+            )
+        )
+        # (capability, sorted filters) -> (timestamp, ttl, agents)
+        self._discover_cache: Dict[tuple, tuple] = {}
+
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        self._http.close()
+
+    def __enter__(self) -> "PorosClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _post_with_retry(self, url: str, **kwargs) -> httpx.Response:
+        """POST, retrying transport errors and 502/503/504 with backoff."""
+        response = None
+        for attempt in range(_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(_backoff_delay(attempt))
+            try:
+                response = self._http.post(url, **kwargs)
+            except httpx.TransportError:
+                if attempt == _MAX_ATTEMPTS - 1:
+                    raise
+                continue
+            if response.status_code not in _RETRY_STATUS:
+                break
+        return response
+
+    def _set_token(self, token: str) -> None:
+        """
+        Store the JWT and attach it to every subsequent request.
+
+        Setting it on the session means the header is formatted once
+        per token change, not rebuilt per call.
+        """
+        self._token = token
+        self._http.headers["Authorization"] = f"Bearer {token}"
 
     def register_user(self, username: str, email: str, password: str) -> str:
         """
@@ -35,13 +118,13 @@ class PorosClient:
         Returns:
             JWT access token
         """
-        response = httpx.post(
-            f"{self.backend_url}/api/registry/users",
+        response = self._post_with_retry(
+            "/api/registry/users",
             json={"username": username, "email": email, "password": password}
         )
         response.raise_for_status()
         data = response.json()
-        self._token = data["access_token"]
+        self._set_token(data["access_token"])
         return self._token
 
     def login(self, username: Optional[str] = None, password: Optional[str] = None) -> str:
@@ -61,13 +144,13 @@ class PorosClient:
         if not user or not pwd:
             raise ValueError("Username and password required")
 
-        response = httpx.post(
-            f"{self.backend_url}/api/registry/login",
+        response = self._post_with_retry(
+            "/api/registry/login",
             data={"username": user, "password": pwd}
         )
         response.raise_for_status()
         data = response.json()
-        self._token = data["access_token"]
+        self._set_token(data["access_token"])
         return self._token
 
     def register_agent(self, agent_card: Dict[str, Any]) -> Dict[str, Any]:
@@ -86,9 +169,8 @@ class PorosClient:
             else:
                 raise ValueError("Not authenticated. Call login() first or provide username/password")
 
-        response = httpx.post(
-            f"{self.backend_url}/api/registry/agents",
-            headers={"Authorization": f"Bearer {self._token}"},
+        response = self._post_with_retry(
+            "/api/registry/agents",
             json={"agent_card": agent_card}
         )
         response.raise_for_status()
@@ -103,18 +185,31 @@ class PorosClient:
             filters: Optional filters (e.g., max_price, location)
 
         Returns:
-            List of matching agents
+            List of matching agents (cached for up to 60s, or the
+            server-advertised Cache-Control max-age if present)
         """
+        key = (capability, tuple(sorted((filters or {}).items())))
+        cached = self._discover_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < cached[1]:
+            return cached[2]
+
         payload = {"capability": capability}
         if filters:
             payload["filters"] = filters
 
-        response = httpx.post(
-            f"{self.backend_url}/orchestrate/discover",
+        response = self._post_with_retry(
+            "/orchestrate/discover",
             json=payload
         )
         response.raise_for_status()
-        return response.json()["agents"]
+        agents = response.json()["agents"]
+
+        if len(self._discover_cache) >= _DISCOVER_CACHE_MAX:
+            self._discover_cache.pop(next(iter(self._discover_cache)))
+        self._discover_cache[key] = (
+            time.monotonic(), _discover_ttl_for(response, _DISCOVER_TTL), agents
+        )
+        return agents
 
     def query_agent(self, agent_did: str, query: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -127,13 +222,34 @@ class PorosClient:
         Returns:
             Agent's response
         """
-        response = httpx.post(
-            f"{self.backend_url}/orchestrate/query",
+        response = self._post_with_retry(
+            "/orchestrate/query",
             json={"agent_did": agent_did, "query": query}
         )
         response.raise_for_status()
         return response.json()
 
+    def query_agents_bulk(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send many QUERY requests in a single backend round-trip.
+
+        The backend fans the queries out concurrently, so N queries
+        cost one client RTT instead of N.
+
+        Args:
+            queries: List of {"agent_did": ..., "query": {...}} dicts
+
+        Returns:
+            Per-query results in request order; failed entries carry
+            an "error" key instead of a "response"
+        """
+        response = self._post_with_retry(
+            "/orchestrate/query_bulk",
+            json={"queries": queries}
+        )
+        response.raise_for_status()
+        return response.json()["results"]
+
     def propose_to_agent(self, agent_did: str, proposal: Dict[str, Any]) -> Dict[str, Any]:
         """
         Send a PROPOSE request to an agent.
@@ -145,8 +261,8 @@ class PorosClient:
         Returns:
             Agent's response (accepted/rejected/counter)
         """
-        response = httpx.post(
-            f"{self.backend_url}/orchestrate/propose",
+        response = self._post_with_retry(
+            "/orchestrate/propose",
             json={"agent_did": agent_did, "proposal": proposal}
         )
         response.raise_for_status()
@@ -164,8 +280,8 @@ class PorosClient:
         Returns:
             Commitment confirmation
         """
-        response = httpx.post(
-            f"{self.backend_url}/orchestrate/commit",
+        response = self._post_with_retry(
+            "/orchestrate/commit",
             json={
                 "agent_did": agent_did,
                 "proposal_id": proposal_id,
@@ -194,8 +310,294 @@ class PorosClient:
         Returns:
             Cancellation confirmation
         """
-        response = httpx.post(
-            f"{self.backend_url}/orchestrate/cancel",
+        response = self._post_with_retry(
+            "/orchestrate/cancel",
+            json={
+                "agent_did": agent_did,
+                "commitment_id": commitment_id,
+                "reason": reason,
+                "refund_requested": refund_requested
+            }
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class AsyncPorosClient:
+    """
+    Async client for interacting with the Poros Protocol backend.
+
+    Same API as PorosClient with every method as a coroutine. Because
+    discover_agents returns a list, the natural follow-up is one query
+    per discovered agent - with this client those fan out concurrently
+    and multiplex over a single pooled HTTP/2 connection::
+
+        async with AsyncPorosClient() as client:
+            agents = await client.discover_agents("weather_forecast")
+            results = await asyncio.gather(
+                *[client.query_agent(a["did"], query) for a in agents]
+            )
+    """
+
+    def __init__(
+        self,
+        backend_url: str = "https://poros-protocol-production.up.railway.app",
+        username: Optional[str] = None,
+        password: Optional[str] = None
+    ):
+        """
+        Initialize async Poros client.
+
+        Args:
+            backend_url: URL of the Poros backend
+            username: Your Poros username (optional)
+            password: Your Poros password (optional)
+        """
+        self.backend_url = backend_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self._token: Optional[str] = None
+        self._http = httpx.AsyncClient(
+            base_url=self.backend_url,
+            timeout=10.0,
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=20)
+            )
+        )
+        # (capability, sorted filters) -> (timestamp, ttl, agents)
+        self._discover_cache: Dict[tuple, tuple] = {}
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncPorosClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    async def _post_with_retry(self, url: str, **kwargs) -> httpx.Response:
+        """POST, retrying transport errors and 502/503/504 with backoff."""
+        response = None
+        for attempt in range(_MAX_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(_backoff_delay(attempt))
+            try:
+                response = await self._http.post(url, **kwargs)
+            except httpx.TransportError:
+                if attempt == _MAX_ATTEMPTS - 1:
+                    raise
+                continue
+            if response.status_code not in _RETRY_STATUS:
+                break
+        return response
+
+    def _set_token(self, token: str) -> None:
+        """Store the JWT and attach it to every subsequent request."""
+        self._token = token
+        self._http.headers["Authorization"] = f"Bearer {token}"
+
+    async def register_user(self, username: str, email: str, password: str) -> str:
+        """
+        Register a new user account.
+
+        Returns:
+            JWT access token
+        """
+        response = await self._post_with_retry(
+            "/api/registry/users",
+            json={"username": username, "email": email, "password": password}
+        )
+        response.raise_for_status()
+        data = response.json()
+        self._set_token(data["access_token"])
+        return self._token
+
+    async def login(self, username: Optional[str] = None, password: Optional[str] = None) -> str:
+        """
+        Login and get JWT token.
+
+        Args:
+            username: Username (uses self.username if not provided)
+            password: Password (uses self.password if not provided)
+
+        Returns:
+            JWT access token
+        """
+        user = username or self.username
+        pwd = password or self.password
+
+        if not user or not pwd:
+            raise ValueError("Username and password required")
+
+        response = await self._post_with_retry(
+            "/api/registry/login",
+            data={"username": user, "password": pwd}
+        )
+        response.raise_for_status()
+        data = response.json()
+        self._set_token(data["access_token"])
+        return self._token
+
+    async def register_agent(self, agent_card: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Register an agent with the Poros network.
+
+        Args:
+            agent_card: AgentCard dictionary
+
+        Returns:
+            Registered agent data
+        """
+        if not self._token:
+            if self.username and self.password:
+                await self.login()
+            else:
+                raise ValueError("Not authenticated. Call login() first or provide username/password")
+
+        response = await self._post_with_retry(
+            "/api/registry/agents",
+            json={"agent_card": agent_card}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def discover_agents(self, capability: str, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Discover agents by capability.
+
+        Args:
+            capability: The capability to search for
+            filters: Optional filters (e.g., max_price, location)
+
+        Returns:
+            List of matching agents (cached for up to 60s, or the
+            server-advertised Cache-Control max-age if present)
+        """
+        key = (capability, tuple(sorted((filters or {}).items())))
+        cached = self._discover_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < cached[1]:
+            return cached[2]
+
+        payload = {"capability": capability}
+        if filters:
+            payload["filters"] = filters
+
+        response = await self._post_with_retry(
+            "/orchestrate/discover",
+            json=payload
+        )
+        response.raise_for_status()
+        agents = response.json()["agents"]
+
+        if len(self._discover_cache) >= _DISCOVER_CACHE_MAX:
+            self._discover_cache.pop(next(iter(self._discover_cache)))
+        self._discover_cache[key] = (
+            time.monotonic(), _discover_ttl_for(response, _DISCOVER_TTL), agents
+        )
+        return agents
+
+    async def query_agent(self, agent_did: str, query: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a QUERY request to an agent.
+
+        Args:
+            agent_did: DID of the agent
+            query: Query payload
+
+        Returns:
+            Agent's response
+        """
+        response = await self._post_with_retry(
+            "/orchestrate/query",
+            json={"agent_did": agent_did, "query": query}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def query_agents_bulk(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send many QUERY requests in a single backend round-trip.
+
+        Args:
+            queries: List of {"agent_did": ..., "query": {...}} dicts
+
+        Returns:
+            Per-query results in request order; failed entries carry
+            an "error" key instead of a "response"
+        """
+        response = await self._post_with_retry(
+            "/orchestrate/query_bulk",
+            json={"queries": queries}
+        )
+        response.raise_for_status()
+        return response.json()["results"]
+
+    async def propose_to_agent(self, agent_did: str, proposal: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a PROPOSE request to an agent.
+
+        Args:
+            agent_did: DID of the agent
+            proposal: Proposal payload
+
+        Returns:
+            Agent's response (accepted/rejected/counter)
+        """
+        response = await self._post_with_retry(
+            "/orchestrate/propose",
+            json={"agent_did": agent_did, "proposal": proposal}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def commit_proposal(self, agent_did: str, proposal_id: str, payment_proof: Optional[str] = None) -> Dict[str, Any]:
+        """
+        COMMIT to an accepted proposal.
+
+        Args:
+            agent_did: DID of the agent
+            proposal_id: ID of the proposal to commit
+            payment_proof: Optional payment proof
+
+        Returns:
+            Commitment confirmation
+        """
+        response = await self._post_with_retry(
+            "/orchestrate/commit",
+            json={
+                "agent_did": agent_did,
+                "proposal_id": proposal_id,
+                "payment_proof": payment_proof
+            }
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def cancel_commitment(
+        self,
+        agent_did: str,
+        commitment_id: str,
+        reason: Optional[str] = None,
+        refund_requested: bool = False
+    ) -> Dict[str, Any]:
+        """
+        CANCEL a committed transaction.
+
+        Args:
+            agent_did: DID of the agent
+            commitment_id: ID of the commitment to cancel
+            reason: Optional cancellation reason
+            refund_requested: Whether to request a refund
+
+        Returns:
+            Cancellation confirmation
+        """
+        response = await self._post_with_retry(
+            "/orchestrate/cancel",
             json={
                 "agent_did": agent_did,
                 "commitment_id": commitment_id,
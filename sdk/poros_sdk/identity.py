@@ -2,12 +2,37 @@
 Identity utilities - DID generation and AgentCard signing
 """
 
-import json
 import base64
+from functools import lru_cache
+
+import orjson
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from cryptography.hazmat.primitives import serialization
 from typing import Tuple, Dict, Any
 
+# Assembled in bytes so DID construction is one concatenation + one
+# ascii decode instead of b64 decode / rstrip / f-string copies
+_DID_PREFIX = b"did:poros:ed25519:"
+
+
+def _did_from_public_bytes(public_bytes: bytes) -> str:
+    """Build a did:poros:ed25519 DID from raw public key bytes."""
+    return (_DID_PREFIX + base64.urlsafe_b64encode(public_bytes).rstrip(b"=")).decode("ascii")
+
+
+@lru_cache(maxsize=32)
+def _load_pk(private_key_pem: str) -> Ed25519PrivateKey:
+    """
+    Parse a PEM private key, memoized per PEM string.
+
+    Agents sign many AgentCards with the same key; caching skips the
+    ASN.1/PKCS8 parse on every call after the first.
+    """
+    return serialization.load_pem_private_key(
+        private_key_pem.encode('utf-8'),
+        password=None
+    )
+
 
 def generate_did() -> Tuple[str, str]:
     """
@@ -24,8 +49,7 @@ def generate_did() -> Tuple[str, str]:
         format=serialization.PublicFormat.Raw
     )
 
-    public_b64 = base64.urlsafe_b64encode(public_bytes).decode('utf-8').rstrip('=')
-    did = f"did:poros:ed25519:{public_b64}"
+    did = _did_from_public_bytes(public_bytes)
 
     private_pem = private_key.private_bytes(
         encoding=serialization.Encoding.PEM,
@@ -36,6 +60,71 @@ def generate_did() -> Tuple[str, str]:
     return did, private_pem
 
 
+def generate_did_raw() -> Tuple[str, bytes]:
+    """
+    Generate a new Ed25519 keypair and DID, returning the raw seed.
+
+    For keys that live only in-process (agent startup, tests) this
+    skips the PEM serialize/parse round-trip that generate_did() +
+    sign_agent_card() would pay. Use generate_did() when the key needs
+    to be stored on disk.
+
+    Returns:
+        Tuple of (did, 32-byte raw private key)
+    """
+    private_key = Ed25519PrivateKey.generate()
+    public_key = private_key.public_key()
+
+    public_bytes = public_key.public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    )
+
+    did = _did_from_public_bytes(public_bytes)
+
+    private_raw = private_key.private_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PrivateFormat.Raw,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+    return did, private_raw
+
+
+def sign_agent_card_raw(agent_card: Dict[str, Any], private_key_raw: bytes) -> str:
+    """
+    Sign an AgentCard with a raw 32-byte Ed25519 private key.
+
+    Args:
+        agent_card: AgentCard as dictionary (without 'signature' field)
+        private_key_raw: Raw private key from generate_did_raw()
+
+    Returns:
+        Base64-encoded signature
+    """
+    message = orjson.dumps(agent_card, option=orjson.OPT_SORT_KEYS)
+    signature = Ed25519PrivateKey.from_private_bytes(private_key_raw).sign(message)
+    return base64.b64encode(signature).decode('ascii')
+
+
+def sign_agent_card_bytes(agent_card: Dict[str, Any], private_key_pem: str) -> bytes:
+    """
+    Sign an AgentCard and return the raw 64-byte signature.
+
+    Signing loops that serialize elsewhere (or not at all) can skip the
+    base64 encode/decode copies sign_agent_card() adds.
+
+    Args:
+        agent_card: AgentCard as dictionary (without 'signature' field)
+        private_key_pem: PEM-encoded private key
+
+    Returns:
+        Raw Ed25519 signature bytes
+    """
+    message = orjson.dumps(agent_card, option=orjson.OPT_SORT_KEYS)
+    return _load_pk(private_key_pem).sign(message)
+
+
 def sign_agent_card(agent_card: Dict[str, Any], private_key_pem: str) -> str:
     """
     Sign an AgentCard with a private key.
@@ -47,13 +136,4 @@ def sign_agent_card(agent_card: Dict[str, Any], private_key_pem: str) -> str:
     Returns:
         Base64-encoded signature
     """
-    canonical_json = json.dumps(agent_card, sort_keys=True, separators=(',', ':'))
-    message = canonical_json.encode('utf-8')
-
-    private_key = serialization.load_pem_private_key(
-        private_key_pem.encode('utf-8'),
-        password=None
-    )
-
-    signature = private_key.sign(message)
-    return base64.b64encode(signature).decode('utf-8')
+    return base64.b64encode(sign_agent_card_bytes(agent_card, private_key_pem)).decode('ascii')
@@ -0,0 +1,136 @@
+"""
+Test script for PorosClient retry behavior - transient failures and backoff
+"""
+
+import asyncio
+
+import httpx
+
+from poros_sdk import AsyncPorosClient, PorosClient
+
+# The backoff sleeps are tiny (50/100ms), so exercising the full retry
+# loop against a mock transport keeps each test well under a second.
+
+
+def _mock_client(statuses):
+    """PorosClient whose transport pops one status per request."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        status = statuses[min(len(calls) - 1, len(statuses) - 1)]
+        if status == "drop":
+            raise httpx.ConnectError("connection dropped", request=request)
+        return httpx.Response(status, json={"agents": [{"did": "did:poros:test"}]})
+
+    client = PorosClient()
+    client._http = httpx.Client(
+        base_url=client.backend_url, transport=httpx.MockTransport(handler)
+    )
+    return client, calls
+
+
+def _mock_async_client(statuses):
+    """AsyncPorosClient with the same one-status-per-request transport."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        status = statuses[min(len(calls) - 1, len(statuses) - 1)]
+        if status == "drop":
+            raise httpx.ConnectError("connection dropped", request=request)
+        return httpx.Response(status, json={"agents": []})
+
+    client = AsyncPorosClient()
+    client._http = httpx.AsyncClient(
+        base_url=client.backend_url, transport=httpx.MockTransport(handler)
+    )
+    return client, calls
+
+
+# Test 1: transient 503s are retried until success
+print("=" * 60)
+print("TEST 1: Retry Through Transient 503s")
+print("=" * 60)
+
+client, calls = _mock_client([503, 503, 200])
+agents = client.discover_agents("weather_forecast")
+retry_ok = len(calls) == 3 and agents == [{"did": "did:poros:test"}]
+print(f"[OK] Attempts made: {len(calls)}")
+print(f"[OK] Result after retries: {agents}")
+print()
+
+# Test 2: non-retryable statuses surface on the first attempt
+print("=" * 60)
+print("TEST 2: 404 Is Not Retried")
+print("=" * 60)
+
+client, calls = _mock_client([404])
+try:
+    client.query_agent("did:poros:missing", {"action": "get_weather"})
+    no_retry_ok = False
+except httpx.HTTPStatusError:
+    no_retry_ok = len(calls) == 1
+print(f"[OK] Attempts made: {len(calls)}")
+print()
+
+# Test 3: persistent 503 gives up after the attempt budget
+print("=" * 60)
+print("TEST 3: Persistent 503 Exhausts Attempts")
+print("=" * 60)
+
+client, calls = _mock_client([503])
+try:
+    client.discover_agents("weather_forecast")
+    exhaust_ok = False
+except httpx.HTTPStatusError:
+    exhaust_ok = len(calls) == 3
+print(f"[OK] Attempts made: {len(calls)}")
+print()
+
+# Test 4: dropped connections retry, then the error propagates
+print("=" * 60)
+print("TEST 4: Transport Errors Retry Then Raise")
+print("=" * 60)
+
+client, calls = _mock_client(["drop"])
+try:
+    client.discover_agents("weather_forecast")
+    transport_ok = False
+except httpx.TransportError:
+    transport_ok = len(calls) == 3
+print(f"[OK] Attempts made: {len(calls)}")
+print()
+
+# Test 5: the async client retries the same way
+print("=" * 60)
+print("TEST 5: AsyncPorosClient Retries 502s")
+print("=" * 60)
+
+
+async def _async_case():
+    client, calls = _mock_async_client([502, 200])
+    agents = await client.discover_agents("weather_forecast")
+    await client.aclose()
+    return len(calls) == 2 and agents == []
+
+
+async_ok = asyncio.run(_async_case())
+print(f"[OK] Async retry succeeded: {async_ok}")
+print()
+
+# Summary
+print("=" * 60)
+print("SUMMARY")
+print("=" * 60)
+print(f"✓ Transient 503 retry: {'PASS' if retry_ok else 'FAIL'}")
+print(f"✓ No retry on 404: {'PASS' if no_retry_ok else 'FAIL'}")
+print(f"✓ Attempt budget on persistent 503: {'PASS' if exhaust_ok else 'FAIL'}")
+print(f"✓ Transport error retry then raise: {'PASS' if transport_ok else 'FAIL'}")
+print(f"✓ Async client retry: {'PASS' if async_ok else 'FAIL'}")
+print()
+
+if retry_ok and no_retry_ok and exhaust_ok and transport_ok and async_ok:
+    print("🎉 ALL TESTS PASSED! Retry behavior is working correctly.")
+else:
+    print("❌ SOME TESTS FAILED!")
@@ -5,7 +5,7 @@ import sys
 sys.path.insert(0, 'sdk')
 
 from poros_sdk import PorosClient, generate_did, sign_agent_card
-import json
+import orjson
 
 print("=" * 60)
 print("TESTING END-TO-END QUERY FLOW")
@@ -68,12 +68,11 @@ try:
     print(f"  DID in response: {result.get('did')}")
 except Exception as e:
     print(f"[ERROR] Agent registration failed: {e}")
-    # Try to get detailed error from response
-    import httpx
+    # Try to get detailed error from response - reuse the client's
+    # pooled connection (Authorization is already on its headers)
     try:
-        response = httpx.post(
-            "https://poros-protocol-production.up.railway.app/api/registry/agents",
-            headers={"Authorization": f"Bearer {client._token}"},
+        response = client._http.post(
+            "/api/registry/agents",
             json={"agent_card": agent_card}
         )
         print(f"[DEBUG] Status: {response.status_code}")
@@ -117,7 +116,7 @@ try:
     })
     print("[OK] QUERY SUCCESSFUL!")
     print(f"\nResponse:")
-    print(json.dumps(response, indent=2))
+    print(orjson.dumps(response, option=orjson.OPT_INDENT_2).decode())
 
     # The response is nested: response.response.result
     agent_response = response.get('response', {})
@@ -9,13 +9,16 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'sdk'))
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import asyncio
+from collections import Counter
+from fastapi import FastAPI, HTTPException, Request, Response
 from typing import Optional, Dict, Any
 import httpx
+import orjson
 import uvicorn
+from cachetools import TTLCache
 
-from poros_sdk import PorosClient, generate_did, sign_agent_card
+from poros_sdk import AsyncPorosClient, generate_did_raw, sign_agent_card_raw
 
 # ============================================
 # CONFIGURATION
@@ -34,6 +37,28 @@ OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5"
 # Poros capability
 CAPABILITY = "weather_forecast"
 
+# Signed registration payload, pre-baked once after signing so
+# periodic re-registration re-POSTs cached bytes instead of
+# re-canonicalizing the (static) AgentCard every time
+SIGNED_CARD_BYTES: Optional[bytes] = None
+REGISTRATION_CLIENT: Optional[AsyncPorosClient] = None
+HEARTBEAT_INTERVAL = 600.0  # seconds between re-registrations
+
+# Weather barely changes minute-to-minute, and the free tier allows
+# only 60 upstream calls/min - short TTL caches save both the external
+# RTT and quota. Concurrent misses coalesce per key via in-flight
+# futures: a burst of queries for one city collapses to a single
+# upstream call, and different cities never queue behind each other.
+_WEATHER_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=300)
+_FORECAST_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=1800)
+_INFLIGHT: Dict[tuple, asyncio.Future] = {}
+_INFLIGHT_LOCK = asyncio.Lock()
+
+# Long-lived upstream client - created at app startup so every /query
+# reuses one keep-alive connection to OpenWeatherMap instead of paying
+# a fresh TLS handshake per request
+OPENWEATHER_CLIENT: Optional[httpx.AsyncClient] = None
+
 # ============================================
 # FASTAPI APP
 # ============================================
@@ -44,25 +69,92 @@ app = FastAPI(
     version="1.0.0"
 )
 
+
+async def _heartbeat_loop():
+    """Periodically re-POST the pre-baked signed card to stay registered"""
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        if SIGNED_CARD_BYTES is None or REGISTRATION_CLIENT is None:
+            continue
+        try:
+            # The payload is the cached bytes; no dict -> JSON work here
+            await REGISTRATION_CLIENT._http.post(
+                "/api/registry/agents",
+                content=SIGNED_CARD_BYTES,
+                headers={"content-type": "application/json"}
+            )
+        except Exception as e:
+            print(f"[WARNING] Heartbeat re-registration failed: {e}")
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Create the shared OpenWeatherMap client and start the heartbeat"""
+    global OPENWEATHER_CLIENT
+    OPENWEATHER_CLIENT = httpx.AsyncClient(
+        base_url=OPENWEATHER_BASE_URL,
+        http2=True,
+        timeout=10.0,
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
+    # Registration runs in the background so /health answers Railway's
+    # probes immediately instead of waiting out three backend RTTs
+    asyncio.create_task(register_with_poros())
+    asyncio.create_task(_heartbeat_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared OpenWeatherMap client"""
+    if OPENWEATHER_CLIENT is not None:
+        await OPENWEATHER_CLIENT.aclose()
+
 # ============================================
-# REQUEST/RESPONSE MODELS
+# QUERY RESPONSES
 # ============================================
 
-class QueryRequest(BaseModel):
-    action: str
-    parameters: Dict[str, Any]
-
+def _query_response(status: str, result: Optional[Dict[str, Any]] = None,
+                    error: Optional[str] = None) -> Response:
+    """
+    Serialize a query response straight through orjson.
 
-class QueryResponse(BaseModel):
-    status: str
-    result: Optional[Dict[str, Any]] = None
-    error: Optional[str] = None
+    The /query payloads are a two-field envelope, so the pydantic
+    model pair this replaces bought no real validation - just
+    per-field Python overhead on every request.
+    """
+    return Response(
+        content=orjson.dumps({"status": status, "result": result, "error": error}),
+        media_type="application/json"
+    )
 
 
 # ============================================
 # WEATHER API INTEGRATION
 # ============================================
 
+async def _coalesced_fetch(cache: TTLCache, key: tuple, fetch) -> Dict[str, Any]:
+    """
+    Single-flight cache fill: the first task to miss on a key starts
+    fetch(), later ones await the same future. The lock only guards the
+    dicts - never the upstream call - so a slow fetch for one city
+    can't block requests for another.
+    """
+    async with _INFLIGHT_LOCK:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        future = _INFLIGHT.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            _INFLIGHT[key] = future
+    try:
+        return await future
+    finally:
+        # Successes live in the TTL cache; failures aren't pinned, so
+        # the next request retries upstream
+        _INFLIGHT.pop(key, None)
+
+
 async def get_current_weather(city: str, country_code: Optional[str] = None) -> Dict[str, Any]:
     """
     Get current weather for a city using OpenWeatherMap API.
@@ -88,36 +180,48 @@ async def get_current_weather(city: str, country_code: Optional[str] = None) ->
             "description": "Demo data - set OPENWEATHER_API_KEY env var for real data"
         }
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{OPENWEATHER_BASE_URL}/weather",
+    cache_key = ("weather", city.lower(), country_code or "")
+    cached = _WEATHER_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def fetch() -> Dict[str, Any]:
+        try:
+            response = await OPENWEATHER_CLIENT.get(
+                "/weather",
                 params={
                     "q": location,
                     "appid": OPENWEATHER_API_KEY,
                     "units": "imperial"  # Fahrenheit
-                },
-                timeout=10.0
+                }
             )
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
-            return {
+            # Bind the sub-dicts once instead of re-subscripting data
+            # for every field
+            main = data["main"]
+            weather0 = data["weather"][0]
+            result = {
                 "location": data["name"],
                 "country": data["sys"]["country"],
-                "temperature": data["main"]["temp"],
-                "feels_like": data["main"]["feels_like"],
-                "condition": data["weather"][0]["main"],
-                "description": data["weather"][0]["description"],
-                "humidity": data["main"]["humidity"],
+                "temperature": main["temp"],
+                "feels_like": main["feels_like"],
+                "condition": weather0["main"],
+                "description": weather0["description"],
+                "humidity": main["humidity"],
                 "wind_speed": data["wind"]["speed"],
-                "pressure": data["main"]["pressure"]
+                "pressure": main["pressure"]
             }
+            _WEATHER_CACHE[cache_key] = result
+            return result
 
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=502, detail=f"Weather API error: {e.response.status_code}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch weather: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=502, detail=f"Weather API error: {e.response.status_code}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch weather: {str(e)}")
+
+    return await _coalesced_fetch(_WEATHER_CACHE, cache_key, fetch)
 
 
 async def get_forecast(city: str, days: int = 5) -> Dict[str, Any]:
@@ -143,62 +247,78 @@ async def get_forecast(city: str, days: int = 5) -> Dict[str, Any]:
             "note": "Demo data - set OPENWEATHER_API_KEY for real forecasts"
         }
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{OPENWEATHER_BASE_URL}/forecast",
+    cache_key = ("forecast", city.lower(), days)
+    cached = _FORECAST_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def fetch() -> Dict[str, Any]:
+        try:
+            response = await OPENWEATHER_CLIENT.get(
+                "/forecast",
                 params={
                     "q": city,
                     "appid": OPENWEATHER_API_KEY,
                     "units": "imperial",
                     "cnt": min(days * 8, 40)  # API returns 3-hour intervals
-                },
-                timeout=10.0
+                }
             )
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
-            # Group by date
+            # Group by date, tracking running min/max and condition
+            # counts in one pass instead of buffering per-slot lists
             daily_forecast = {}
             for item in data["list"]:
                 date = item["dt_txt"].split()[0]
+                temp = item["main"]["temp"]
                 if date not in daily_forecast:
                     daily_forecast[date] = {
                         "date": date,
-                        "temps": [],
-                        "conditions": []
+                        "temp_high": temp,
+                        "temp_low": temp,
+                        "conditions": Counter()
                     }
-                daily_forecast[date]["temps"].append(item["main"]["temp"])
-                daily_forecast[date]["conditions"].append(item["weather"][0]["main"])
+                else:
+                    date_data = daily_forecast[date]
+                    if temp > date_data["temp_high"]:
+                        date_data["temp_high"] = temp
+                    elif temp < date_data["temp_low"]:
+                        date_data["temp_low"] = temp
+                daily_forecast[date]["conditions"][item["weather"][0]["main"]] += 1
 
             # Aggregate
             forecast = []
             for date_data in list(daily_forecast.values())[:days]:
                 forecast.append({
                     "date": date_data["date"],
-                    "temp_high": max(date_data["temps"]),
-                    "temp_low": min(date_data["temps"]),
-                    "condition": max(set(date_data["conditions"]), key=date_data["conditions"].count)
+                    "temp_high": date_data["temp_high"],
+                    "temp_low": date_data["temp_low"],
+                    "condition": date_data["conditions"].most_common(1)[0][0]
                 })
 
-            return {
+            result = {
                 "location": data["city"]["name"],
                 "country": data["city"]["country"],
                 "forecast": forecast
             }
+            _FORECAST_CACHE[cache_key] = result
+            return result
 
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=502, detail=f"Weather API error: {e.response.status_code}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch forecast: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=502, detail=f"Weather API error: {e.response.status_code}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch forecast: {str(e)}")
+
+    return await _coalesced_fetch(_FORECAST_CACHE, cache_key, fetch)
 
 
 # ============================================
 # POROS PROTOCOL ENDPOINTS
 # ============================================
 
-@app.post("/query", response_model=QueryResponse)
-async def handle_query(request: QueryRequest):
+@app.post("/query")
+async def handle_query(request: Request):
     """
     Handle QUERY requests from the Poros orchestrator.
 
@@ -207,54 +327,47 @@ async def handle_query(request: QueryRequest):
     - get_forecast: Get 5-day forecast for a city
     """
     try:
-        if request.action == "get_weather":
-            city = request.parameters.get("city")
-            if not city:
-                return QueryResponse(
-                    status="error",
-                    error="Missing required parameter: city"
+        body = orjson.loads(await request.body())
+        action = body.get("action")
+        parameters = body.get("parameters") or {}
+
+        match action:
+            case "get_weather":
+                city = parameters.get("city")
+                if not city:
+                    return _query_response(
+                        "error",
+                        error="Missing required parameter: city"
+                    )
+
+                country_code = parameters.get("country_code")
+                weather_data = await get_current_weather(city, country_code)
+
+                return _query_response("success", result=weather_data)
+
+            case "get_forecast":
+                city = parameters.get("city")
+                if not city:
+                    return _query_response(
+                        "error",
+                        error="Missing required parameter: city"
+                    )
+
+                days = parameters.get("days", 5)
+                forecast_data = await get_forecast(city, days)
+
+                return _query_response("success", result=forecast_data)
+
+            case _:
+                return _query_response(
+                    "error",
+                    error=f"Unknown action: {action}. Supported: get_weather, get_forecast"
                 )
 
-            country_code = request.parameters.get("country_code")
-            weather_data = await get_current_weather(city, country_code)
-
-            return QueryResponse(
-                status="success",
-                result=weather_data
-            )
-
-        elif request.action == "get_forecast":
-            city = request.parameters.get("city")
-            if not city:
-                return QueryResponse(
-                    status="error",
-                    error="Missing required parameter: city"
-                )
-
-            days = request.parameters.get("days", 5)
-            forecast_data = await get_forecast(city, days)
-
-            return QueryResponse(
-                status="success",
-                result=forecast_data
-            )
-
-        else:
-            return QueryResponse(
-                status="error",
-                error=f"Unknown action: {request.action}. Supported: get_weather, get_forecast"
-            )
-
     except HTTPException as e:
-        return QueryResponse(
-            status="error",
-            error=e.detail
-        )
+        return _query_response("error", error=e.detail)
     except Exception as e:
-        return QueryResponse(
-            status="error",
-            error=f"Internal error: {str(e)}"
-        )
+        return _query_response("error", error=f"Internal error: {str(e)}")
 
 
 @app.get("/health")
@@ -272,28 +385,29 @@ async def health():
 # REGISTRATION
 # ============================================
 
-def register_with_poros():
-    """Register this agent with the Poros network."""
+async def register_with_poros():
+    """Register this agent with the Poros network (background task)."""
 
     print(f"\n{'='*60}")
     print(f"Registering {AGENT_NAME} with Poros Protocol")
     print(f"{'='*60}\n")
 
-    client = PorosClient()
+    client = AsyncPorosClient()
 
     # Step 1: Register/login user
     print("Step 1: Authenticating...")
     username = "weather_service"
     try:
-        token = client.register_user(username, f"{username}@poros.com", "secure_pass_123")
+        token = await client.register_user(username, f"{username}@poros.com", "secure_pass_123")
         print(f"[OK] Authenticated as {username}\n")
     except Exception as e:
         print(f"[INFO] User exists, that's fine: {e}\n")
         return False
 
-    # Step 2: Generate DID
+    # Step 2: Generate DID (raw key - it never leaves this process, so
+    # skip the PEM serialize/parse round-trip)
     print("Step 2: Generating cryptographic identity...")
-    did, private_key = generate_did()
+    did, private_key = generate_did_raw()
     print(f"[OK] DID: {did}\n")
 
     # Step 3: Create AgentCard
@@ -335,14 +449,26 @@ def register_with_poros():
 
     # Step 4: Sign AgentCard
     print("Step 4: Signing AgentCard...")
-    signature = sign_agent_card(agent_card, private_key)
+    signature = sign_agent_card_raw(agent_card, private_key)
     agent_card["signature"] = signature
     print(f"[OK] Signed\n")
 
+    # Pre-bake the registration payload - the heartbeat loop re-POSTs
+    # these exact bytes without re-serializing the card
+    global SIGNED_CARD_BYTES, REGISTRATION_CLIENT
+    SIGNED_CARD_BYTES = orjson.dumps({"agent_card": agent_card})
+    REGISTRATION_CLIENT = client
+
     # Step 5: Register
     print("Step 5: Registering with Poros network...")
     try:
-        result = client.register_agent(agent_card)
+        response = await client._http.post(
+            "/api/registry/agents",
+            content=SIGNED_CARD_BYTES,
+            headers={"content-type": "application/json"}
+        )
+        response.raise_for_status()
+        result = response.json()
         print(f"[SUCCESS] Agent registered!")
         print(f"  Agent ID: {result['agent_id']}")
         print(f"  DID: {result.get('did', 'N/A')}")
@@ -358,18 +484,20 @@ def register_with_poros():
 # ============================================
 
 if __name__ == "__main__":
-    # Try to register (but start server regardless)
-    try:
-        register_with_poros()
-    except Exception as e:
-        print(f"[WARNING] Registration failed: {e}")
-        print("[INFO] Starting server anyway...\n")
-
-    # Always start the server
+    # Registration happens in the startup hook, off the critical path
     print("=" * 60)
     print(f"{AGENT_NAME} is live!")
     print(f"Listening on: {AGENT_URL}")
     print("=" * 60)
     print()
 
-    uvicorn.run(app, host="0.0.0.0", port=AGENT_PORT)
+    # uvloop + httptools come with uvicorn[standard]; access_log off
+    # keeps per-request formatting out of the small-payload hot path
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=AGENT_PORT,
+        loop="uvloop",
+        http="httptools",
+        access_log=False
+    )